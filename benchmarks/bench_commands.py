@@ -0,0 +1,47 @@
+"""End-to-end command scenarios over a synthetic project tree."""
+
+
+def test_list(benchmark, registry, bench_rounds):
+    benchmark.pedantic(
+        registry.command,
+        kwargs={'command': 'list', 'channels': ['project'], 'sort_by': 'name', 'status': None},
+        rounds=bench_rounds,
+    )
+
+
+def test_stage_web(benchmark, registry, bench_rounds):
+    benchmark.pedantic(
+        registry.command,
+        kwargs={'command': 'stage', 'channels': ['website'], 'all_projects': True},
+        rounds=bench_rounds,
+    )
+
+
+def test_stage_github(benchmark, registry, bench_rounds):
+    benchmark.pedantic(
+        registry.command,
+        kwargs={'command': 'stage', 'channels': ['github'], 'all_projects': True},
+        rounds=bench_rounds,
+    )
+
+
+def test_publish_raw(benchmark, registry, bench_rounds):
+    benchmark.pedantic(
+        registry.command,
+        kwargs={'command': 'publish', 'channels': ['raw'], 'all_projects': True},
+        rounds=bench_rounds,
+    )
+
+
+def test_publish_pdf(benchmark, staged_site, bench_rounds):
+    benchmark.pedantic(
+        staged_site.command,
+        kwargs={
+            'command': 'publish',
+            'channels': ['pdf'],
+            'all_projects': True,
+            'collate_images': True,
+            'submission_name': 'Benchmark',
+        },
+        rounds=bench_rounds,
+    )
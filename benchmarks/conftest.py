@@ -0,0 +1,98 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from benchmarks.generate import TreeSpec, generate_tree
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def spec_from_env() -> TreeSpec:
+    """Build the synthetic tree spec, overridable with LUNA_BENCH_* environment variables"""
+    defaults = TreeSpec()
+    return TreeSpec(
+        projects=int(os.environ.get('LUNA_BENCH_PROJECTS', defaults.projects)),
+        images=int(os.environ.get('LUNA_BENCH_IMAGES', defaults.images)),
+        videos=int(os.environ.get('LUNA_BENCH_VIDEOS', defaults.videos)),
+        models=int(os.environ.get('LUNA_BENCH_MODELS', defaults.models)),
+        model_facets=int(os.environ.get('LUNA_BENCH_MODEL_FACETS', defaults.model_facets)),
+        seed=int(os.environ.get('LUNA_BENCH_SEED', defaults.seed)),
+    )
+
+
+@pytest.fixture(scope='session')
+def bench_rounds() -> int:
+    return int(os.environ.get('LUNA_BENCH_ROUNDS', 3))
+
+
+@pytest.fixture(scope='session')
+def bench_root(tmp_path_factory) -> Path:
+    """Synthetic project tree plus an empty Jekyll site skeleton"""
+    root = tmp_path_factory.mktemp('luna-bench')
+    generate_tree(root / 'projects', spec_from_env())
+    for folder in ['_posts', '_media', '_pages']:
+        (root / 'site' / folder).mkdir(parents=True)
+    return root
+
+
+@pytest.fixture(scope='session')
+def fake_gh(tmp_path_factory):
+    """Put a `gh` stub on PATH so repo visibility lookups don't hit the network"""
+    bin_dir = tmp_path_factory.mktemp('bin')
+    gh = bin_dir / 'gh'
+    gh.write_text("#!/bin/sh\necho PRIVATE\n")
+    gh.chmod(0o755)
+
+    path = os.environ.get('PATH', '')
+    os.environ['PATH'] = f"{bin_dir}{os.pathsep}{path}"
+    yield gh
+    os.environ['PATH'] = path
+
+
+@pytest.fixture(scope='session')
+def personal_info(bench_root) -> Path:
+    """The example personal info, copied beside the tree so the source tree is left untouched"""
+    path = bench_root / 'personal-info.yml'
+    shutil.copy(REPO_ROOT / 'src' / 'personal-info.yml.example', path)
+    return path
+
+
+@pytest.fixture(scope='session')
+def config(bench_root, personal_info):
+    from src.script.config import Config
+
+    return Config(
+        base_dir=bench_root / 'projects',
+        website_domain='https://example.com',
+        github_username='bench',
+        github_token='',
+        instagram_username='',
+        instagram_password='',
+        website_dir=bench_root / 'site',
+        enable_things3=False,
+        website_posts='_posts',
+        website_media='_media',
+        website_pages='_pages',
+        things3_area='',
+        personal_info_file=personal_info,
+    )
+
+
+@pytest.fixture(scope='session')
+def registry(config, bench_root, fake_gh):
+    from src.script.main import setup_channel_registry
+
+    # Media conversions write to a relative temp/ folder
+    cwd = os.getcwd()
+    os.chdir(bench_root)
+    yield setup_channel_registry(config)
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope='session')
+def staged_site(registry):
+    """Website media staged once, for scenarios (PDF video links) that read it"""
+    registry.command(command='stage', channels=['website'], all_projects=True)
+    return registry
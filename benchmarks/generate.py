@@ -0,0 +1,157 @@
+"""
+Generate synthetic PROJECT_BASE_DIR trees for benchmarking.
+
+Projects are created from the real `templates/setup/metadata.yml` schema and
+filled with seeded random images, videos and STL models so that runs are
+reproducible across commits.
+
+    python -m benchmarks.generate /tmp/luna-bench --projects 20 --images 6
+"""
+import argparse
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from src.script.constants import Files, Media
+
+SETUP_TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'src' / 'script' / 'templates' / 'setup'
+STATUSES = ['backlog', 'in_progress', 'complete', 'archive']
+
+
+@dataclass
+class TreeSpec:
+    projects: int = 10
+    images: int = 4
+    videos: int = 1
+    models: int = 1
+    image_size: tuple = (2400, 1600)
+    video_size: tuple = (640, 360)
+    video_seconds: float = 2.0
+    model_facets: int = 20000
+    seed: int = 0
+
+
+def write_image(path: Path, size: tuple, rng) -> None:
+    from PIL import Image
+
+    width, height = size
+    # Low-resolution noise upscaled so files compress like photographs rather than pure noise
+    noise = rng.integers(0, 255, (max(height // 16, 1), max(width // 16, 1), 3), dtype=np.uint8)
+    Image.fromarray(noise).resize((width, height), Image.Resampling.BICUBIC).save(path, quality=92)
+
+
+def write_video(path: Path, size: tuple, seconds: float, rng) -> None:
+    from moviepy import ColorClip
+
+    color = [int(c) for c in rng.integers(0, 255, 3)]
+    clip = ColorClip(size=size, color=color, duration=seconds).with_fps(24)
+    clip.write_videofile(str(path), codec='libx264', audio=False, logger=None)
+    clip.close()
+
+
+def write_stl(path: Path, facets: int, rng) -> None:
+    """Write a binary STL of random triangles"""
+    record = np.dtype([
+        ('normal', '<f4', (3,)),
+        ('vertices', '<f4', (3, 3)),
+        ('attr', '<u2'),
+    ])
+    data = np.zeros(facets, dtype=record)
+    data['vertices'] = rng.random((facets, 3, 3), dtype=np.float32) * 100
+    with open(path, 'wb') as f:
+        f.write(b'luna benchmark model'.ljust(80, b'\0'))
+        f.write(struct.pack('<I', facets))
+        data.tofile(f)
+
+
+def generate_project(base_dir: Path, index: int, spec: TreeSpec, rng) -> str:
+    name = f"bench-project-{index:04d}"
+    project_dir = base_dir / name
+
+    for folder in ['src', 'content', 'media', 'media-internal']:
+        (project_dir / folder).mkdir(parents=True, exist_ok=True)
+    for media in Media.ALL_TYPES:
+        (project_dir / 'media' / media.TYPE).mkdir(exist_ok=True)
+        (project_dir / 'media-internal' / media.TYPE).mkdir(exist_ok=True)
+
+    template = (SETUP_TEMPLATES_DIR / Files.METADATA).read_text()
+    metadata = yaml.safe_load(template.format(
+        name=name,
+        display_name=f"Bench Project {index}",
+        title=f"Bench Project {index}",
+        date=f"2024-01-{index % 28 + 1:02d}",
+    ))
+
+    project = metadata['project']
+    project['status'] = STATUSES[index % len(STATUSES)]
+    project['priority'] = index % 5
+    project['tagline'] = f"Synthetic project number {index}"
+    project['tags'] = ['art'] if index % 2 else ['code']
+    if spec.images:
+        project['featured_content']['source'] = 'images/image-01.jpg'
+    metadata['physical_specifications']['dimensions'].update(width=10, height=20, depth=5, unit='cm')
+    metadata['physical_specifications']['materials'] = ['wood', 'steel']
+
+    with open(project_dir / 'content' / Files.METADATA, 'w') as f:
+        yaml.safe_dump(metadata, f, sort_keys=False)
+
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+    (project_dir / 'content' / Files.CONTENT).write_text("\n\n".join([paragraph] * 5))
+    (project_dir / 'content' / Files.README).write_text(f"## Setup\n\n{paragraph}\n")
+    (project_dir / Files.GITIGNORE).write_text((SETUP_TEMPLATES_DIR / Files.GITIGNORE).read_text())
+
+    for i in range(1, spec.images + 1):
+        write_image(project_dir / 'media' / Media.IMAGES.TYPE / f"image-{i:02d}.jpg", spec.image_size, rng)
+    for i in range(1, spec.videos + 1):
+        write_video(project_dir / 'media' / Media.VIDEOS.TYPE / f"video-{i:02d}.mp4", spec.video_size, spec.video_seconds, rng)
+    for i in range(1, spec.models + 1):
+        write_stl(project_dir / 'media' / Media.MODELS.TYPE / f"model-{i:02d}.stl", spec.model_facets, rng)
+
+    return name
+
+
+def generate_tree(base_dir: Path, spec: TreeSpec) -> list:
+    """Create `spec.projects` synthetic projects under base_dir and return their names"""
+    base_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(spec.seed)
+    return [generate_project(base_dir, i, spec, rng) for i in range(spec.projects)]
+
+
+def parse_arguments():
+    defaults = TreeSpec()
+    parser = argparse.ArgumentParser(description='Generate a synthetic project tree for benchmarks')
+    parser.add_argument('base_dir', help='Directory to create projects in')
+    parser.add_argument('--projects', '-n', type=int, default=defaults.projects, help='Number of projects')
+    parser.add_argument('--images', type=int, default=defaults.images, help='Images per project')
+    parser.add_argument('--videos', type=int, default=defaults.videos, help='Videos per project')
+    parser.add_argument('--models', type=int, default=defaults.models, help='STL models per project')
+    parser.add_argument('--image-size', type=int, nargs=2, default=defaults.image_size, help='Image width and height')
+    parser.add_argument('--video-size', type=int, nargs=2, default=defaults.video_size, help='Video width and height')
+    parser.add_argument('--video-seconds', type=float, default=defaults.video_seconds, help='Video duration')
+    parser.add_argument('--model-facets', type=int, default=defaults.model_facets, help='Triangles per STL model')
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='Random seed')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    spec = TreeSpec(
+        projects=args.projects,
+        images=args.images,
+        videos=args.videos,
+        models=args.models,
+        image_size=tuple(args.image_size),
+        video_size=tuple(args.video_size),
+        video_seconds=args.video_seconds,
+        model_facets=args.model_facets,
+        seed=args.seed,
+    )
+    names = generate_tree(Path(args.base_dir), spec)
+    print(f"Generated {len(names)} projects in {args.base_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path
+
+# Media that is already compressed and gains nothing from deflate
+STORED_SUFFIXES = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp',
+    '.mp4', '.mov', '.webm', '.mp3', '.m4a',
+    '.pdf', '.glb', '.zip', '.gz', '.zst',
+}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ZipArchiveWriter:
+    """Streams files into a zip, storing already-compressed media as-is"""
+
+    def __init__(self, path: Path):
+        self.zip = zipfile.ZipFile(path, 'w', allowZip64=True)
+
+    def add(self, arcname: str, source: Path) -> None:
+        info = zipfile.ZipInfo.from_file(source, arcname)
+        if source.suffix.lower() in STORED_SUFFIXES:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+
+        with open(source, 'rb') as src, self.zip.open(info, 'w', force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+    def close(self) -> None:
+        self.zip.close()
+
+
+class TarZstArchiveWriter:
+    """Streams files through tar into a zstd frame without buffering whole files"""
+
+    def __init__(self, path: Path):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("tar.zst archives require the 'zstandard' package") from e
+
+        self.file = open(path, 'wb')
+        # zstd passes incompressible blocks (jpg/mp4) through as raw blocks cheaply
+        compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+        self.stream = compressor.stream_writer(self.file)
+        self.tar = tarfile.open(fileobj=self.stream, mode='w|', bufsize=CHUNK_SIZE)
+
+    def add(self, arcname: str, source: Path) -> None:
+        self.tar.add(str(source), arcname=arcname, recursive=False)
+
+    def close(self) -> None:
+        self.tar.close()
+        self.stream.close()
+
+
+# Archive format (also the file extension) to the writer that streams it
+ARCHIVE_FORMATS = {
+    'zip': ZipArchiveWriter,
+    'tar.zst': TarZstArchiveWriter,
+}
+
+
+def write_archive(path: Path, archive_format: str, files) -> int:
+    """
+    Write (arcname, source) pairs into a single archive at path.
+    The archive is built next to its destination and moved into place when complete.
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format: {archive_format}")
+
+    temp_path = path.with_name(f".{path.name}.partial")
+    writer = ARCHIVE_FORMATS[archive_format](temp_path)
+
+    count = 0
+    try:
+        for arcname, source in files:
+            writer.add(arcname, Path(source))
+            count += 1
+        writer.close()
+    except Exception:
+        writer.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    os.replace(temp_path, path)
+    return count
@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict
+
+from src.script.metrics import record_cache_hit
+from src.script.utils import file_digest
+
+
+class MediaCache:
+    """
+    Content-addressed store for derived media files.
+
+    Entries are keyed by the hash of the source file plus the conversion profile,
+    so a derivative is rebuilt only when its source or settings change.
+    """
+
+    def __init__(self, root: Path, media_type: str):
+        self.root = Path(root) / media_type
+        self.media_type = media_type
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def key(self, source: Path, profile: Dict) -> str:
+        payload = json.dumps(profile, sort_keys=True)
+        return hashlib.sha256(f"{file_digest(source)}:{payload}".encode()).hexdigest()[:32]
+
+    def path_for(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get_or_create(self, source: Path, profile: Dict, suffix: str, build: Callable[[Path], None]) -> Path:
+        """Return the cached derivative of source, calling build(path) to create it on a miss"""
+        key = self.key(source, profile)
+        path = self.path_for(key, suffix)
+
+        with self._lock_for(key):
+            if path.exists():
+                record_cache_hit(self.media_type)
+                return path
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f".{path.stem}.{os.getpid()}.tmp{suffix}")
+            try:
+                build(temp_path)
+                os.replace(temp_path, path)
+            finally:
+                temp_path.unlink(missing_ok=True)
+
+        return path
@@ -0,0 +1,76 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.script.constants import Files
+
+
+class ProjectCatalog:
+    """
+    Projects under base_dir, discovered with a single os.scandir pass.
+
+    Directory entries come from scandir without a stat; each candidate costs one
+    stat of its metadata.yml, whose result is kept for change detection.
+    """
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self._projects: Optional[Dict[str, os.stat_result]] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        projects = {}
+        with os.scandir(self.base_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(('.', '_')) or not entry.is_dir():
+                    continue
+                try:
+                    projects[entry.name] = os.stat(os.path.join(entry.path, 'content', Files.METADATA))
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+
+        with self._lock:
+            self._projects = projects
+
+    def _ensure_scanned(self) -> Dict[str, os.stat_result]:
+        if self._projects is None:
+            self.refresh()
+        return self._projects
+
+    def names(self) -> List[str]:
+        return sorted(self._ensure_scanned())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ensure_scanned()
+
+    def __len__(self) -> int:
+        return len(self._ensure_scanned())
+
+    def metadata_stat(self, name: str) -> os.stat_result:
+        """Stat of the project's metadata.yml from the last scan, stat'ing only unknown projects"""
+        stat = self._ensure_scanned().get(name)
+        if stat is None:
+            stat = os.stat(self.base_dir / name / 'content' / Files.METADATA)
+            with self._lock:
+                self._projects[name] = stat
+        return stat
+
+    def invalidate(self) -> None:
+        """Forget the last scan, e.g. after projects were created, renamed or deleted"""
+        with self._lock:
+            self._projects = None
+
+
+_catalogs: Dict[Path, ProjectCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_project_catalog(self) -> ProjectCatalog:
+    """Shared catalog for the configured base_dir, scanned on first use"""
+    base_dir = Path(self.config.base_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(base_dir)
+        if catalog is None:
+            catalog = _catalogs[base_dir] = ProjectCatalog(base_dir)
+    return catalog
@@ -4,6 +4,13 @@ from src.script.utils import setup_logging
 
 
 class Channel:
+    # Channels whose tasks must complete first, per command, e.g. {'publish': ('website',)}
+    dependencies = {}
+    # Commands that can run as independent per-project tasks
+    project_commands = ()
+    # Commands that run only when the channel is named with --channels, never through --all-channels
+    explicit_commands = ()
+
     def __init__(self, name, class_name, config: Config) -> None:
         self.config = config
         self.class_name = class_name
@@ -19,20 +26,30 @@ class Channel:
         
     def validate_projects(self, projects):
         """Validate that projects exist. Return the valid projects."""
-        from src.script.utils import get_project_path, is_project
+        from src.script.catalog import get_project_catalog
         
+        catalog = get_project_catalog(self)
         valid_projects = []
         for name in projects:
-            project_path = get_project_path(self, name)
-            if is_project(self, project_path):
+            if name in catalog:
                 valid_projects.append(name)
             else:
                 self.logger.warning(f"Project '{name}' not found or invalid")
         
         return valid_projects
     
+    def splits_by_project(self, command, context):
+        """Whether a command invocation can be split into independent per-project tasks."""
+        return command in self.project_commands
+    
     def register_commands(self, registry):
         """Register this channel's commands with the provided registry."""
         commands = self.get_commands()
         if commands:
-            registry.register(self.class_name.replace('Handler', '').lower(), commands)
\ No newline at end of file
+            registry.register(
+                self.class_name.replace('Handler', '').lower(),
+                commands,
+                dependencies=self.dependencies,
+                splits_by_project=self.splits_by_project,
+                explicit_commands=self.explicit_commands,
+            )
\ No newline at end of file
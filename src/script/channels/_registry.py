@@ -1,7 +1,28 @@
-from typing import Callable, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 
+from src.script.catalog import get_project_catalog
 from src.script.config import Config
-from src.script.utils import is_project, setup_logging
+from src.script.output import outputs
+from src.script.records import expire_project_records
+from src.script.tracing import span
+from src.script.utils import setup_logging
+
+
+@dataclass
+class Task:
+    channel: str
+    project: Optional[str]
+    func: Callable
+    depends_on: List[Tuple] = field(default_factory=list)
+
+    @property
+    def key(self) -> Tuple:
+        return (self.channel, self.project)
+
+    def __str__(self) -> str:
+        return f"{self.channel}:{self.project}" if self.project else self.channel
 
 
 class ChannelRegistry:
@@ -9,56 +30,83 @@ class ChannelRegistry:
         self.config = config
         self.logger = setup_logging(__name__)
         self._channels = {}
+        self._dependencies = {}
+        self._splitters = {}
+        self._explicit = {}
+
+    def register(self, channel: str, funcs: Dict[str, Callable], dependencies: Optional[Dict] = None, splits_by_project: Optional[Callable] = None, explicit_commands: Tuple = ()):
+       """
+       Register a channel's commands.
 
-    def register(self, channel: str, funcs: Dict[str, Callable]):
+       dependencies maps a command to channels whose tasks must finish first when they
+       are part of the same run; splits_by_project(command, kwargs) says whether the
+       command can run as independent per-project tasks. explicit_commands are left out
+       of --all-channels runs and need the channel named with --channels.
+       """
        self._channels[channel] = {}
        for command, func in funcs.items():
            self._channels[channel][command] = func
+       self._dependencies[channel] = dependencies or {}
+       self._splitters[channel] = splits_by_project
+       self._explicit[channel] = tuple(explicit_commands)
 
-    
-    def command(self, 
+
+    def command(self,
             command: str,
-            channels: Optional[List[str]] = None, 
-            projects: Optional[List[str]] = None, 
+            channels: Optional[List[str]] = None,
+            projects: Optional[List[str]] = None,
             all_projects: Optional[bool] = False,
             all_channels: Optional[bool] = False,
+            jobs: Optional[int] = 1,
             **kwargs):
         """
         Execute a command on specified channels and projects
-        
+
         Args:
             command: The command to execute (e.g., 'publish', 'stage', 'create', 'list')
             channels: List of channel names to execute the command on
             projects: List of project names to apply the command to
             all_projects: If True, apply to all projects
             all_channels: If True, apply to all channels
+            jobs: Maximum number of channel/project tasks to run concurrently
             **kwargs: Additional arguments specific to the command
+
+        Returns:
+            The status of each task ('done', 'failed' or 'skipped') by task key
         """
         # Get all available channels
         all_c = self._channels.keys()
-        
+
         # Determine which channels to use
         if all_channels:
-            channels = list(all_c)
+            channels = [c for c in all_c if command not in self._explicit[c]]
+            for channel in set(all_c) - set(channels):
+                self.logger.info(f"Skipping '{command}' on {channel}: name it with --channels to run it")
         elif not channels:
             raise ValueError("No channels specified. Use --channels or -ch.")
         else:
             invalid_channels = set(channels) - set(all_c)
             if invalid_channels:
                 raise ValueError(f"Invalid channels specified: {invalid_channels}")
-        
+
         # Check if command requires projects
-        project_required_commands = ['publish', 'stage', 'init', 'delete']
+        project_required_commands = ['publish', 'stage', 'init', 'delete', 'duplicates']
         project_optional_commands = []  # Commands where projects are optional
-        project_ignored_commands = ['create', 'list']  # Commands that don't need projects
-        
+        project_ignored_commands = ['create', 'list', 'submit']  # Commands that don't need projects
+        # Commands that read project records, and so start from a fresh scan and records
+        record_commands = project_required_commands + project_optional_commands + ['list', 'submit']
+
+        catalog = get_project_catalog(self)
+        if command in record_commands:
+            # Discover projects once per command; handlers share this scan
+            catalog.refresh()
+            expire_project_records()
+            outputs.reset()
+
         # For commands that require or use projects, validate them
         if command in project_required_commands or command in project_optional_commands:
-            all_p = []
-            for item in self.config.base_dir.iterdir():
-                if is_project(self, item):
-                    all_p.append(item.name)
-                    
+            all_p = catalog.names()
+
             if all_projects:
                 projects = all_p
             elif not projects and command in project_required_commands:
@@ -67,22 +115,106 @@ class ChannelRegistry:
                 invalid_projects = set(projects) - set(all_p)
                 if invalid_projects:
                     raise ValueError(f"Invalid projects specified: {invalid_projects}")
-        
+
         # Prepare context for executing the command
         command_context = {
             **kwargs,
             'projects': projects if command not in project_ignored_commands else None
         }
-        
+
         # Execute command on specified channels
-        executed = False
+        supported = []
         for channel in channels:
             if command in self._channels[channel]:
-                self.logger.info(f"Executing '{command}' on channel '{channel}'")
-                self._channels[channel][command](**command_context)
-                executed = True
+                supported.append(channel)
             else:
                 self.logger.info(f"Channel '{channel}' does not support command '{command}'")
-        
-        if not executed:
-            self.logger.warning(f"Command '{command}' was not executed on any channel.")
\ No newline at end of file
+
+        if not supported:
+            self.logger.warning(f"Command '{command}' was not executed on any channel.")
+            return {}
+
+        tasks = self.plan_tasks(command, supported, command_context)
+        with span(command, 'command', channels=','.join(supported)):
+            results = self.run_tasks(command, tasks, command_context, max(int(jobs or 1), 1))
+
+        if command in record_commands and (outputs.changed or outputs.unchanged):
+            self.logger.info(f"Generated outputs: {outputs.summary()}")
+
+        failed = [str(task) for task in tasks if results[task.key] != 'done']
+        if failed:
+            self.logger.error(f"Command '{command}' did not complete for: {', '.join(failed)}")
+        return results
+
+    def plan_tasks(self, command: str, channels: List[str], context: Dict) -> List[Task]:
+        """Build channel (or channel x project) tasks and their dependency edges"""
+        tasks = []
+        by_channel = {}
+        projects = context.get('projects') or []
+
+        for channel in channels:
+            func = self._channels[channel][command]
+            splitter = self._splitters.get(channel)
+            if projects and splitter and splitter(command, context):
+                channel_tasks = [Task(channel, name, func) for name in projects]
+            else:
+                channel_tasks = [Task(channel, None, func)]
+            by_channel[channel] = channel_tasks
+            tasks.extend(channel_tasks)
+
+        for task in tasks:
+            for dependency in self._dependencies[task.channel].get(command, ()):
+                for other in by_channel.get(dependency, []):
+                    # Per-project tasks only wait on the same project's tasks of a split channel
+                    if task.project and other.project and task.project != other.project:
+                        continue
+                    task.depends_on.append(other.key)
+
+        return tasks
+
+    def run_tasks(self, command: str, tasks: List[Task], context: Dict, max_workers: int) -> Dict[Tuple, str]:
+        """
+        Run tasks as their dependencies complete, at most max_workers at a time.
+        A failed task does not stop unrelated ones; only its dependents are skipped.
+        """
+        status = {task.key: 'pending' for task in tasks}
+        waiting = list(tasks)
+        running = {}
+
+        def run(task: Task):
+            task_context = context if task.project is None else {**context, 'projects': [task.project]}
+            self.logger.info(f"Executing '{command}' on {task}")
+            with span(f"{task.channel}.{command}", 'channel', project=task.project or ''):
+                task.func(**task_context)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='channel') as executor:
+            while waiting or running:
+                for task in list(waiting):
+                    dependency_status = [status[key] for key in task.depends_on]
+                    if any(s in ('failed', 'skipped') for s in dependency_status):
+                        status[task.key] = 'skipped'
+                        waiting.remove(task)
+                        self.logger.warning(f"Skipping '{command}' on {task}: a dependency did not complete")
+                    elif all(s == 'done' for s in dependency_status) and len(running) < max_workers:
+                        waiting.remove(task)
+                        status[task.key] = 'running'
+                        running[executor.submit(run, task)] = task
+
+                if not running:
+                    # Anything still waiting depends on itself (a dependency cycle)
+                    for task in waiting:
+                        status[task.key] = 'skipped'
+                        self.logger.error(f"Skipping '{command}' on {task}: circular channel dependencies")
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    try:
+                        future.result()
+                        status[task.key] = 'done'
+                    except Exception as e:
+                        status[task.key] = 'failed'
+                        self.logger.error(f"'{command}' failed on {task}: {e}")
+
+        return status
@@ -1,18 +1,23 @@
-import os
 import subprocess
 
 from src.script.channels._channel import Channel
 from src.script.config import Config
 from src.script.constants import Files, Media, Status
+from src.script.output import outputs
+from src.script.records import get_project_record
+from src.script.tracing import traced
 from src.script.utils import (
     get_project_media_files,
-    get_project_metadata,
     get_project_path,
 )
+from src.script.vcs import GitError, init_repository, open_repository
 
 
 class GithubHandler(Channel):
 
+    # Each project's README and repository are independent of the others
+    project_commands = ('init', 'stage', 'publish')
+
     def __init__(self, config: Config):
 
         init = {
@@ -70,56 +75,58 @@ class GithubHandler(Channel):
             except Exception as e:
                 self.logger.error(f"Failed to publish {name} to GitHub: {e}")
 
+    @traced('project', label='project')
     def create(self, name: str) -> None:
         
         project_dir = get_project_path(self, name)
 
         try:
-            os.chdir(project_dir)
-            subprocess.run(['git', 'init'], check=True)
-            subprocess.run(['git', 'add', Files.GITIGNORE], check=True)
-            subprocess.run(['git', 'commit', '-m', 'Initial commit with metadata, and .gitignore'], check=True)
-            subprocess.run(['gh', 'repo', 'create', name, '--private', '--source=.'], check=True)
-            subprocess.run(['git', 'branch', '-M', 'main'], check=True)
-            subprocess.run(['git', 'push', '-u', 'origin', 'main'], check=True)
+            repo = init_repository(self, project_dir)
+            repo.add(Files.GITIGNORE)
+            repo.commit('Initial commit with metadata, and .gitignore')
+            subprocess.run(['gh', 'repo', 'create', name, '--private', '--source=.'], check=True, cwd=project_dir)
+            repo.push('origin', 'main', set_upstream=True)
             self.logger.info(f"Successfully created GitHub repo for {name}")
-        except subprocess.CalledProcessError as e:
+        except (GitError, subprocess.CalledProcessError) as e:
             self.logger.error(f"GitHub initialization failed: {e}")
             raise
 
+    @traced('project', label='project')
     def publish(self, name: str, commit_message: str) -> None:
 
         project_dir = get_project_path(self, name)
-        metadata = get_project_metadata(self, name)
-        status = metadata['project']['status']
-        tagline = metadata['project']['tagline']
-        os.chdir(project_dir)
-        result = subprocess.run(['git', 'status', '--porcelain'], capture_output=True, text=True)
+        record = get_project_record(self, name)
+        status = record.status
+        tagline = record.tagline
 
         try:
-            if result.stdout.strip():
-                
-                if status == Status.COMPLETE:
-                    subprocess.run(['gh', 'repo', 'edit', '--homepage', f"{self.config.website_domain}/{name}"])
+            repo = open_repository(self, project_dir)
+            if repo.is_dirty():
 
+                # One gh call for both repository settings
+                edits = []
+                if status == Status.COMPLETE:
+                    edits += ['--homepage', f"{self.config.website_domain}/{name}"]
                 if tagline:
-                    subprocess.run(['gh', 'repo', 'edit', '--description', f"{tagline}"])
+                    edits += ['--description', f"{tagline}"]
+                if edits:
+                    subprocess.run(['gh', 'repo', 'edit', *edits], cwd=project_dir)
 
-                subprocess.run(['git', 'add', '.'], check=True)
-                subprocess.run(['git', 'commit', '-m', f"{commit_message}"], check=True)
-                subprocess.run(['git', 'push', 'origin', 'main'], check=True)
+                repo.add_all()
+                repo.commit(commit_message)
+                repo.push('origin', 'main')
                 self.logger.info(f"Git changes synced for project: {name}")
             else:
                 self.logger.info(f"No changes to publish for project: {name}")
-        except subprocess.CalledProcessError as e:
+        except (GitError, subprocess.CalledProcessError) as e:
             self.logger.error(f"Failed to publish GitHub {name}: {e}")
             raise
 
+    @traced('project', label='project')
     def stage(self, name: str) -> None:
         project_dir = get_project_path(self, name)
         readme = self.generate_readme(name)
-        with open(project_dir / Files.README, 'w') as f:
-            f.write(readme)  
+        outputs.write(project_dir / Files.README, readme)
 
     def generate_readme(self, name):
 
@@ -139,28 +146,28 @@ class GithubHandler(Channel):
         
         try:
             project_dir = get_project_path(self, new_name)
-            os.chdir(project_dir)
+            repo = open_repository(self, project_dir)
             
             # First get the current remote URL to verify the repository name
-            subprocess.check_output(['git', 'remote', 'get-url', 'origin'], text=True).strip()
+            repo.remote_url('origin')
             
             # Commit local changes before renaming repository
-            subprocess.run(['git', 'add', '.'], check=True)
-            subprocess.run(['git', 'commit', '-m', f'Rename project to {new_name}'], check=True)
+            repo.add_all()
+            repo.commit(f'Rename project to {new_name}')
             
             # Rename the repository using the old name
             subprocess.run(['gh', 'repo', 'rename', new_name, '--repo', 
-                          f'{self.config.github_username}/{old_name}'], check=True)
+                          f'{self.config.github_username}/{old_name}'], check=True, cwd=project_dir)
             
             # Update remote URL
             new_remote = f'git@github.com:{self.config.github_username}/{new_name}.git'
-            subprocess.run(['git', 'remote', 'set-url', 'origin', new_remote], check=True)
+            repo.set_remote_url(new_remote, 'origin')
             
             # Push changes
-            subprocess.run(['git', 'push', 'origin', 'main'], check=True)
+            repo.push('origin', 'main')
             
             self.logger.info(f"Successfully renamed GitHub repo to {new_name}")
-        except subprocess.CalledProcessError as e:
+        except (GitError, subprocess.CalledProcessError) as e:
             self.logger.warning(f"Failed to update GitHub repo: {e}")
 
     def delete(self, name: str) -> None:
@@ -1,19 +1,31 @@
 import os
 from pathlib import Path
+from typing import List
 
 from instagrapi import Client
 from instagrapi.exceptions import LoginRequired
 from instagrapi.types import Location
 
+from src.script.cache import MediaCache
 from src.script.channels._channel import Channel
 from src.script.config import Config
-from src.script.constants import Media
-from src.script.utils import get_project_media_files, get_project_metadata
+from src.script.dedupe import get_publishable_images
+from src.script.records import get_project_record
+from src.script.tracing import traced
+from src.script.upload_queue import UploadQueue, UploadRunner
+from src.script.utils import (
+    INSTAGRAM_QUALITY,
+    INSTAGRAM_WIDTH,
+    create_instagram_image,
+)
 
 
 class InstagramHandler(Channel):
 
-    def __init__(self, config: Config):
+    # Posting is public and can't be undone, so --all-channels never posts
+    explicit_commands = ('publish',)
+
+    def __init__(self, config: Config, client=None):
         init = {
             'name': __name__,
             'class_name':self.__class__.__name__,
@@ -22,8 +34,59 @@ class InstagramHandler(Channel):
             
         super().__init__(**init)
 
-        self.bot = Client()
+        self.bot = client or Client()
         self.bot.delay_range = [1,3]
+        self.cache = MediaCache(config.cache_dir, 'instagram')
+        self.queue = UploadQueue(config.cache_dir / 'instagram' / 'queue.json')
+        self.location = Location(name='Bushwick, NY', lat=40.694428, lng=-73.921286)
+
+    def get_commands(self):
+        """Return commands supported by Instagram handler"""
+        return {
+            'stage': self.handle_stage,
+            'publish': self.handle_publish,
+        }
+
+    def handle_stage(self, **kwargs):
+        """Pre-render Instagram images for projects"""
+        projects = self.validate_projects(kwargs.get('projects', []))
+        for name in projects:
+            try:
+                self.stage(name)
+            except Exception as e:
+                self.logger.error(f"Failed to stage Instagram images for {name}: {e}")
+
+    def handle_publish(self, **kwargs):
+        """Publish an album post per project"""
+        projects = self.validate_projects(kwargs.get('projects', []))
+        caption = kwargs.get('caption', '')
+
+        try:
+            self.login()
+        except Exception as e:
+            self.logger.error(f"Failed to log in to Instagram: {e}")
+            raise
+
+        # Projects being published now resume their own pending job via publish()
+        self.resume_pending(skip_projects=projects)
+
+        for name in projects:
+            try:
+                self.publish(name, caption)
+            except Exception as e:
+                self.logger.error(f"Failed to publish {name} to Instagram: {e}")
+
+    def resume_pending(self, skip_projects=()) -> None:
+        """Finish album posts left pending by earlier interrupted runs"""
+        runner = UploadRunner(self.bot, self.queue, self.logger)
+        for job in self.queue.pending():
+            if job['project'] in skip_projects:
+                continue
+            try:
+                self.logger.info(f"Resuming Instagram upload for {job['project']}")
+                runner.run(job, self.location)
+            except Exception as e:
+                self.logger.error(f"Failed to resume Instagram upload for {job['project']}: {e}")
 
     def login(self) -> None:
 
@@ -61,39 +124,58 @@ class InstagramHandler(Channel):
                 verification_code = input("Enter 2FA verification code: ")
                 self.bot.login(self.config.instagram_username, self.config.instagram_password, verification_code=verification_code)
                 self.bot.dump_settings(session_path)
+                login_via_pw = True
             except Exception as e:
                 self.logger.info(f"Couldn't login user using username and password: {e}")
 
         if not login_via_session and not login_via_pw:
             raise Exception("Couldn't login user with either password or session")
 
+    @traced('project', label='project')
     def publish(self, name, caption) -> None:
         try:
-            # self.login()
-            metadata = get_project_metadata(self, name)
-            featured_content = metadata['project']['featured_content']
-
-            images = get_project_media_files(self, name, Media.IMAGES.TYPE)
-
-            if featured_content['type'] == 'image': 
-                images = sorted(images, key=lambda x: 0 if featured_content['source'] in str(x) else 1)
+            record = get_project_record(self, name)
+            images = self.stage(name)
 
             if caption == '':
-                caption = metadata['project']['tagline']
+                caption = record.tagline
 
-            self.bot.album_upload(
-                images, 
-                caption, 
-                location=Location(name='Bushwick, NY', lat=40.694428, lng=-73.921286)
-            )
+            job = self.queue.enqueue(name, caption, images)
+            UploadRunner(self.bot, self.queue, self.logger).run(job, self.location)
 
             self.logger.info("Published instagram")
         except Exception as e:
             self.logger.error(f"Failed to publish instagram: {e}")
             raise
 
-    def stage(self, name: str) -> str:
-        self.logger.error(f"No stage method for Instagram ({name})")
+    @traced('project', label='project')
+    def stage(self, name: str) -> List[Path]:
+        """Return Instagram-ready derivatives of the project's images, featured image first"""
+        try:
+            record = get_project_record(self, name)
+            featured_content = record.featured_content
+
+            images = get_publishable_images(self, name)
+
+            if featured_content['type'] == 'image': 
+                images = sorted(images, key=lambda x: 0 if featured_content['source'] in str(x) else 1)
+
+            profile = {'width': INSTAGRAM_WIDTH, 'quality': INSTAGRAM_QUALITY}
+            staged = [
+                self.cache.get_or_create(
+                    image,
+                    profile,
+                    '.jpg',
+                    lambda path, image=image: create_instagram_image(self, image, path),
+                )
+                for image in images
+            ]
+
+            self.logger.info(f"Staged {len(staged)} Instagram images for {name}")
+            return staged
+        except Exception as e:
+            self.logger.error(f"Failed to stage Instagram images for {name}: {e}")
+            raise
     
     def rename(self, old_name: str, new_name: str) -> None:
         self.logger.error(f"No rename method for Instagram ({old_name})")
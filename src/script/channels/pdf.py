@@ -1,25 +1,37 @@
+import io
 import shutil
 from pathlib import Path
+from typing import Dict, List
 
+import yaml
 from PyPDF2 import PdfMerger
 from weasyprint import HTML
 
+from src.script.catalog import get_project_catalog
 from src.script.channels._channel import Channel
 from src.script.config import Config
 from src.script.constants import Media
+from src.script.dedupe import get_publishable_images
+from src.script.metrics import record_conversion
+from src.script.output import outputs
+from src.script.records import get_project_record
+from src.script.tracing import traced
 from src.script.utils import (
     format_name,
     get_image_dimensions,
-    get_project_media_files,
-    get_project_metadata,
     get_project_path,
     get_website_media_files,
     load_personal_info,
+    release_temp_file,
     resize_image_file,
 )
 
 
 class PDFHandler(Channel):
+
+    # Video links point at media staged by the website channel
+    dependencies = {'publish': ('website',)}
+
     def __init__(self, config: Config):
         init = {
             'name': __name__,
@@ -33,7 +45,22 @@ class PDFHandler(Channel):
         """Return commands supported by PDF handler"""
         return {
             'publish': self.handle_publish,
+            'submit': self.handle_submit,
         }
+
+    def parse_dimensions(self, max_width, max_height):
+        """Parse max image dimensions from CLI/spec values, falling back to defaults"""
+        if max_width and str(max_width).isdigit():
+            max_width = int(max_width)
+        else:
+            max_width = 1600
+
+        if max_height and str(max_height).isdigit():
+            max_height = int(max_height)
+        else:
+            max_height = 1200
+
+        return max_width, max_height
         
     def handle_publish(self, **kwargs):
         """Handle publish command for PDF generation"""
@@ -45,21 +72,9 @@ class PDFHandler(Channel):
             
         # Extract parameters
         collate_images = kwargs.get('collate_images', False)
-        max_width = kwargs.get('max_width', 1600)
-        max_height = kwargs.get('max_height', 1200)
         filename_prepend = kwargs.get('filename_prepend', '')
         submission_name = kwargs.get('submission_name', '')
-        
-        # Set default values if needed
-        if max_width and isinstance(max_width, str) and max_width.isdigit():
-            max_width = int(max_width)
-        else:
-            max_width = 1600
-            
-        if max_height and isinstance(max_height, str) and max_height.isdigit():
-            max_height = int(max_height)
-        else:
-            max_height = 1200
+        max_width, max_height = self.parse_dimensions(kwargs.get('max_width'), kwargs.get('max_height'))
             
         # Generate PDFs for each project
         for name in projects:
@@ -75,9 +90,117 @@ class PDFHandler(Channel):
         except Exception as e:
             self.logger.error(f"Failed to publish final PDF: {e}")
 
+    def handle_submit(self, **kwargs):
+        """Handle batch generation of several submission PDFs from a YAML spec"""
+        submissions_file = kwargs.get('submissions')
+        if not submissions_file:
+            self.logger.error("No submissions file provided. Use --submissions.")
+            return
+
+        # CLI options act as defaults for every submission in the spec
+        defaults = {
+            'collate_images': kwargs.get('collate_images', False),
+            'max_width': kwargs.get('max_width'),
+            'max_height': kwargs.get('max_height'),
+            'filename_prepend': kwargs.get('filename_prepend', ''),
+        }
+
+        try:
+            submissions = self.load_submissions(Path(submissions_file).expanduser(), defaults)
+            self.publish_submissions(submissions)
+        except Exception as e:
+            self.logger.error(f"Failed to publish submissions: {e}")
+
+    def load_submissions(self, submissions_file: Path, defaults: Dict) -> List[Dict]:
+        """Load a submissions spec, applying spec-level and CLI defaults to each entry"""
+        with open(submissions_file, 'r') as f:
+            spec = yaml.safe_load(f) or {}
+
+        defaults = defaults | (spec.get('defaults') or {})
+        submissions = []
+        for entry in spec.get('submissions') or []:
+            submission = defaults | entry
+            if not submission.get('name'):
+                self.logger.warning("Skipping submission without a name")
+                continue
+
+            submission['projects'] = self.validate_projects(submission.get('projects') or [])
+            if not submission['projects']:
+                self.logger.warning(f"Skipping submission '{submission['name']}': no valid projects")
+                continue
+
+            submission['max_width'], submission['max_height'] = self.parse_dimensions(
+                submission.get('max_width'), submission.get('max_height')
+            )
+            submissions.append(submission)
+
+        return submissions
+
+    def publish_submissions(self, submissions: List[Dict]) -> None:
+        """Render each distinct project once and combine the pages into one PDF per submission"""
+        output_folder = Path(self.config.base_dir / '_output')
+        output_folder.mkdir(exist_ok=True)
+
+        # Rendered project documents keyed by every option that affects their pages
+        rendered = {}
+
+        for submission in submissions:
+            try:
+                options = (
+                    submission['max_width'],
+                    submission['max_height'],
+                    submission['filename_prepend'],
+                    submission['collate_images'],
+                )
+
+                cover = self.render_cover(submission['projects'], submission['name'])
+                pages = list(cover.pages)
+                for name in submission['projects']:
+                    key = (name, *options)
+                    if key not in rendered:
+                        rendered[key] = self.render_project(name, *options, image_dir=output_folder)
+                    else:
+                        self.logger.info(f"Reusing rendered PDF pages for {name}")
+                    pages.extend(rendered[key].pages)
+
+                combined_path = output_folder / f"{self.get_submission_file_name(submission['name'])}.pdf"
+                outputs.write(combined_path, cover.copy(pages).write_pdf())
+                self.logger.info(f"Published PDF at {combined_path}")
+            except Exception as e:
+                self.logger.error(f"Failed to publish submission '{submission['name']}': {e}")
+
+        self.logger.info(f"Rendered {len(rendered)} project PDFs for {len(submissions)} submissions")
+
+    def get_submission_file_name(self, submission_name='') -> str:
+        """Build the combined PDF file name from personal info and the submission name"""
+        # Get personal info for filename
+        try:
+            personal_info = load_personal_info(self)
+            first_name = personal_info.get('name', {}).get('first', 'User')
+            last_name = personal_info.get('name', {}).get('last', '')
+            name = f"{first_name}-{last_name}"
+        except Exception as e:
+            self.logger.error(f"Error loading personal info: {e}")
+            name = "User"
+        
+        # Generate output filename
+        if submission_name:
+            try:
+                file_name, _ = format_name(self, submission_name)
+                return f"{name}-{file_name}"
+            except Exception as e:
+                self.logger.error(f"Error formatting submission name: {e}")
+
+        return f"{name}-submission"
+
+    @traced('project')
     def publish(self, submission_name='') -> None:
-        # Search recursively for temp_pdf folders
-        temp_pdf_folders = list(Path(self.config.base_dir).rglob('temp_pdf'))
+        # Collect temp_pdf folders staged inside each project
+        temp_pdf_folders = [
+            get_project_path(self, name) / 'temp_pdf'
+            for name in get_project_catalog(self).names()
+            if (get_project_path(self, name) / 'temp_pdf').is_dir()
+        ]
         output_folder = Path(self.config.base_dir / '_output')
         
         try:
@@ -131,32 +254,15 @@ class PDFHandler(Channel):
                     self.logger.error(f"Error adding PDF {pdf.name} to merger: {e}")
                     # Continue with other PDFs
             
-            # Get personal info for filename
-            try:
-                personal_info = load_personal_info(self)
-                first_name = personal_info.get('name', {}).get('first', 'User')
-                last_name = personal_info.get('name', {}).get('last', '')
-                name = f"{first_name}-{last_name}"
-            except Exception as e:
-                self.logger.error(f"Error loading personal info: {e}")
-                name = "User"
-            
-            # Generate output filename
-            if submission_name:
-                try:
-                    file_name, _ = format_name(self, submission_name)
-                    file_name = f"{name}-{file_name}"
-                except Exception as e:
-                    self.logger.error(f"Error formatting submission name: {e}")
-                    file_name = f"{name}-submission"
-            else:
-                file_name = f"{name}-submission"
+            file_name = self.get_submission_file_name(submission_name)
 
             # Write combined PDF
             try:
                 combined_path = output_folder / f"{file_name}.pdf"
-                merger.write(str(combined_path))
+                combined = io.BytesIO()
+                merger.write(combined)
                 merger.close()
+                outputs.write(combined_path, combined.getvalue())
                 
                 # Delete source PDFs only after successful write
                 for pdf in pdf_files:
@@ -174,8 +280,14 @@ class PDFHandler(Channel):
             raise
     
     def stage_cover(self, projects, submission_name):
+        pdf = self.render_cover(projects, submission_name)
+        output_path = Path(self.config.base_dir / '_output' / '_cover.pdf')
+        pdf.write_pdf(output_path)
+
+    @traced('project')
+    def render_cover(self, projects, submission_name):
         context = load_personal_info(self)
-        projects = [get_project_metadata(self, p)['project']['title'] for p in projects]
+        projects = [get_project_record(self, p).title for p in projects]
         context = context | {
             'projects': projects,
             'website': self.config.website_domain,
@@ -183,28 +295,44 @@ class PDFHandler(Channel):
             'submission_name': submission_name
         }
         html_string = self.tp.process_pdf_cover_template(context)
-        pdf = HTML(string=html_string).render()
-        output_path = Path(self.config.base_dir / '_output' / '_cover.pdf')
-        pdf.write_pdf(output_path)
+        return HTML(string=html_string).render()
             
     def stage_projects(self, name, max_width, max_height, filename_prepend, collate_images):
         """Generate PDF with optional image collation."""
 
         try:
             project_dir = get_project_path(self, name)
-            metadata = self.tp.process_project_metadata(name)
             temp_dir = project_dir / 'temp_pdf'
             Path(temp_dir).mkdir(exist_ok=True)
 
+            output_pdf = self.render_project(name, max_width, max_height, filename_prepend, collate_images)
+            output_path = temp_dir / f"{name}.pdf"
+            output_pdf.write_pdf(output_path)
+
+            self.logger.info(f"Generated PDF for {name}")
+            
+        except Exception as e:
+            self.logger.error(f"Failed to generate PDF for {name}: {e}")
+            raise
+
+    @traced('project', label='project')
+    def render_project(self, name, max_width, max_height, filename_prepend, collate_images, image_dir=None):
+        """Render a project's PDF document, staging separate image files into image_dir when not collating."""
+
+        try:
+            project_dir = get_project_path(self, name)
+            metadata = self.tp.process_project_metadata(name)
+
             image_pdfs = []
             context = {}
-            images = get_project_media_files(self, name, Media.IMAGES.TYPE)
+            images = get_publishable_images(self, name)
             if collate_images:
                 image_pdfs = self.generate_images_pdf(name, images)
             else:
-                context['image_file_names'] = self.stage_images(name, images, max_width, max_height, filename_prepend)
-            if metadata['project']['featured_content']['type'] == 'image':
-                context['featured_image'] = str((project_dir / 'media' / metadata['project']['featured_content']['source']).absolute())
+                context['image_file_names'] = self.stage_images(name, images, max_width, max_height, filename_prepend, image_dir)
+            featured_content = metadata['project'].featured_content
+            if featured_content['type'] == 'image':
+                context['featured_image'] = str((project_dir / 'media' / featured_content['source']).absolute())
 
             context['video_link'] = self.get_video_link(name)
             context = context | metadata
@@ -213,14 +341,10 @@ class PDFHandler(Channel):
             main_pdf = HTML(string=html_string, base_url=project_dir).render()
             # Combine main content with image pages
             all_pages = main_pdf.pages + image_pdfs
-            output_pdf = main_pdf.copy(all_pages)
-            output_path = temp_dir / f"{name}.pdf"
-            output_pdf.write_pdf(output_path)
-
-            self.logger.info(f"Generated PDF for {name}")
+            return main_pdf.copy(all_pages)
             
         except Exception as e:
-            self.logger.error(f"Failed to generate PDF for {name}: {e}")
+            self.logger.error(f"Failed to render PDF for {name}: {e}")
             raise
 
     def get_video_link(self, name):
@@ -228,21 +352,27 @@ class PDFHandler(Channel):
         return f"{self.config.website_domain}{videos[0]}"
 
 
+    @traced('project', label='project')
     def generate_images_pdf(self, name, images, images_per_page=2):
         try:
             project_dir = get_project_path(self, name)
-            metadata = get_project_metadata(self, name)
+            record = get_project_record(self, name)
             images = sorted(images)
 
             image_groups = self.process_images(images, images_per_page)
+            try:
+                context = self.tp.process_project_metadata(name) | {
+                    'image_groups': image_groups,
+                    'title': record.title
+                }
                 
-            context = self.tp.process_project_metadata(name) | {
-                'image_groups': image_groups,
-                'title': metadata['project']['title']
-            }
-            
-            html_string = self.tp.process_pdf_images_template(name, context)
-            image_pdf = HTML(string=html_string, base_url=project_dir).render()
+                html_string = self.tp.process_pdf_images_template(name, context)
+                image_pdf = HTML(string=html_string, base_url=project_dir).render()
+            finally:
+                # Rendering has read the resized images into the document
+                for group in image_groups:
+                    for image in group['images']:
+                        release_temp_file(image)
             
             self.logger.info(f"Generated image PDFs for {name} with {images_per_page} images per page")
             return image_pdf.pages
@@ -306,10 +436,13 @@ class PDFHandler(Channel):
         
         return image_groups
 
-    def stage_images(self, name, images, max_width, max_height, filename_prepend):
+    @traced('project', label='project')
+    def stage_images(self, name, images, max_width, max_height, filename_prepend, output_dir=None):
         try:
-            project_dir = get_project_path(self, name)
-            temp_dir = project_dir / 'temp_pdf'
+            if output_dir:
+                temp_dir = Path(output_dir)
+            else:
+                temp_dir = get_project_path(self, name) / 'temp_pdf'
             Path(temp_dir).mkdir(exist_ok=True)
             
             counter = 1
@@ -322,7 +455,8 @@ class PDFHandler(Channel):
                     new_name = f"{filename_prepend}_{new_name}"
                 new_names.append(new_name)
                 shutil.copy(str(temp_file), str(temp_dir / new_name))
-                temp_file.unlink()
+                record_conversion(Media.IMAGES.TYPE, file, temp_dir / new_name)
+                release_temp_file(temp_file)
                 counter += 1
             self.logger.info(f"Staged images for {name}")
             return ", ".join(new_names)
@@ -6,14 +6,16 @@ from pathlib import Path
 
 import yaml
 
+from src.script.catalog import get_project_catalog
 from src.script.channels._channel import Channel
 from src.script.config import Config
 from src.script.constants import Files, Media
+from src.script.dedupe import find_duplicates
+from src.script.records import load_project_records
 from src.script.utils import (
     format_name,
     get_project_metadata,
     get_project_path,
-    is_project,
 )
 
 
@@ -39,6 +41,7 @@ class ProjectHandler(Channel):
             'list': self.handle_list,
             'rename': self.handle_rename,
             'delete': self.handle_delete,
+            'duplicates': self.handle_duplicates,
         }
         
     def handle_create(self, **kwargs):
@@ -111,6 +114,7 @@ class ProjectHandler(Channel):
 
             shutil.copy(templates_dir / Files.GITIGNORE, project_dir / Files.GITIGNORE)
 
+            get_project_catalog(self).invalidate()
             self.logger.info(f"Created project files for {name}")
         except Exception as e:
             self.logger.error(f"Failed to create project files for {name}: {e}")
@@ -133,27 +137,43 @@ class ProjectHandler(Channel):
             self.logger.error(f"Failed to create Things 3 project: {e}")
 
 
+    def handle_duplicates(self, **kwargs):
+        """Handle duplicates command"""
+        projects = self.validate_projects(kwargs.get('projects', []))
+        self.report_duplicates(projects)
+
+    def report_duplicates(self, projects) -> None:
+        """Log near-duplicate images for each project"""
+        total = 0
+        for name in projects:
+            try:
+                duplicates = find_duplicates(self, name)
+                total += len(duplicates)
+                for duplicate in duplicates:
+                    self.logger.info(f"{name}: {duplicate.image.name} ~ {duplicate.kept.name} (distance {duplicate.distance:g})")
+            except Exception as e:
+                self.logger.error(f"Failed to check {name} for duplicate images: {e}")
+
+        self.logger.info(f"\n -- Found {total} near-duplicate images in {len(projects)} projects --")
+
     def list_projects(self, sort_by='name', filter_status=None) -> None:
         """List projects with their details, with sorting and filtering options"""
         projects = []
-        for item in self.config.base_dir.iterdir():
-            if is_project(self, item):
-                try:
-                    metadata = get_project_metadata(self, name=item.name)
+        for name, record in load_project_records(self, content=False).items():
+            try:
+                # Only add projects matching the status filter if specified
+                if filter_status and record.status != filter_status:
+                    continue
                     
-                    # Only add projects matching the status filter if specified
-                    if filter_status and metadata['project']['status'] != filter_status:
-                        continue
-                        
-                    projects.append({
-                        'name': item.name,
-                        'display_name': metadata['project']['display_name'],
-                        'date': metadata['project']['date_created'],
-                        'status': metadata['project']['status'],
-                        'priority': metadata['project']['priority']
-                    })
-                except Exception as e:
-                    self.logger.error(f"Error reading project {item.name}: {e}")
+                projects.append({
+                    'name': name,
+                    'display_name': record.display_name,
+                    'date': record.date_created,
+                    'status': record.status,
+                    'priority': record.priority
+                })
+            except Exception as e:
+                self.logger.error(f"Error reading project {name}: {e}")
         
         # Sort projects based on specified field
         if sort_by == 'name':
@@ -216,6 +236,7 @@ class ProjectHandler(Channel):
             
             # Rename local directory
             old_project_dir.rename(new_project_dir)
+            get_project_catalog(self).invalidate()
             self.logger.info(f"Renamed project files from {old_name} to {new_name}")
         except Exception as e:
             self.logger.error(f"Failed to rename project files for {old_name}: {e}")
@@ -269,6 +290,7 @@ class ProjectHandler(Channel):
             
             project_dir = get_project_path(self, name)
             shutil.rmtree(project_dir)
+            get_project_catalog(self).invalidate()
             self.logger.info(f"Deleted project files for {name}")
         except Exception as e:
             self.logger.error(f"Failed to delete project files for {name}: {e}")
@@ -1,12 +1,20 @@
 import shutil
+from pathlib import Path
+from typing import Dict, List
 
+from src.script.archive import write_archive
 from src.script.channels._channel import Channel
 from src.script.config import Config
-from src.script.constants import Media
+from src.script.constants import Files, Media
+from src.script.sync import sync_files
+from src.script.tracing import traced
 from src.script.utils import get_project_media_files, get_project_path
 
 
 class RawHandler(Channel):
+
+    project_commands = ('publish',)
+
     def __init__(self, config: Config):
         init = {
             'name': __name__,
@@ -16,6 +24,10 @@ class RawHandler(Channel):
             
         super().__init__(**init)
         
+    def splits_by_project(self, command, context):
+        # Archives bundle every project into one file
+        return super().splits_by_project(command, context) and not context.get('format')
+
     def get_commands(self):
         """Return commands supported by Raw handler"""
         return {
@@ -25,34 +37,76 @@ class RawHandler(Channel):
     def handle_publish(self, **kwargs):
         """Handle publish command for raw file exports"""
         projects = self.validate_projects(kwargs.get('projects', []))
+
+        archive_format = kwargs.get('format')
+        if archive_format:
+            try:
+                self.publish_archive(projects, archive_format, kwargs.get('archive_name'))
+            except Exception as e:
+                self.logger.error(f"Failed to publish raw archive: {e}")
+            return
+
+        checksum = kwargs.get('checksum', False)
+        hardlink = kwargs.get('hardlink', False)
         for name in projects:
             try:
-                self.publish(name)
+                self.publish(name, checksum, hardlink)
                 self.logger.info(f"Published raw files for {name}")
             except Exception as e:
                 self.logger.error(f"Failed to publish raw files for {name}: {e}")
 
-    def publish(self, name: str) -> None:        
-        try:
-            self.delete(name)
+    def get_export_files(self, name: str) -> Dict[str, Path]:
+        """Map of exported file name to its source in the project"""
+        project_dir = get_project_path(self, name)
+        files = {
+            Files.README: project_dir / 'content' / Files.README,
+            Files.CONTENT: project_dir / 'content' / Files.CONTENT,
+        }
 
-            project_dir = get_project_path(self, name)
-            output_dir = self.config.base_dir / '_output' / name
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            shutil.copy2(project_dir / 'content/README.md', output_dir / 'README.md')
-            shutil.copy2(project_dir / 'content/content.md', output_dir / 'content.md')
+        for media in Media.ALL_TYPES:
+            for file in get_project_media_files(self, name, media.TYPE):
+                files[file.name] = file
 
-            for media in Media.ALL_TYPES:
-                media_files = get_project_media_files(self, name, media.TYPE)
-                for file in media_files:
-                    shutil.copy2(file, str(output_dir / file.name))
+        return files
+
+    @traced('project', label='project')
+    def publish(self, name: str, checksum: bool = False, hardlink: bool = False) -> None:
+        """Sync the project's export files into _output/<name>, copying only what changed"""
+        try:
+            output_dir = self.config.base_dir / '_output' / name
+            stats = sync_files(self.get_export_files(name), output_dir, checksum=checksum, hardlink=hardlink)
                 
-            self.logger.info(f"Published raw content at {output_dir}")
+            self.logger.info(f"Published raw content at {output_dir} ({stats})")
         except Exception as e:
             self.logger.error(f"Error publishing raw: {e}")
             raise
 
+    def publish_archive(self, projects: List[str], archive_format: str, archive_name: str = None) -> Path:
+        """Stream the export files of one or more projects straight into a single archive"""
+        if not projects:
+            raise ValueError("No valid projects to archive")
+
+        if not archive_name:
+            archive_name = projects[0] if len(projects) == 1 else 'raw-export'
+
+        output_folder = self.config.base_dir / '_output'
+        output_folder.mkdir(exist_ok=True)
+        archive_path = output_folder / f"{archive_name}.{archive_format}"
+
+        files = (
+            (f"{name}/{file_name}", source)
+            for name in projects
+            for file_name, source in self.get_export_files(name).items()
+        )
+
+        try:
+            count = write_archive(archive_path, archive_format, files)
+            self.logger.info(f"Published {count} raw files for {len(projects)} projects to {archive_path}")
+            return archive_path
+        except Exception as e:
+            self.logger.error(f"Error writing raw archive {archive_path}: {e}")
+            raise
+
     def delete(self, name: str) -> None:
         try:
             output_dir = self.config.base_dir / '_output' / name
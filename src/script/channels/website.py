@@ -1,25 +1,39 @@
 import os
 import shutil
-import subprocess
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import yaml
 
 from src.script.channels._channel import Channel
 from src.script.config import Config
 from src.script.constants import Media
+from src.script.dedupe import get_publishable_images
+from src.script.journal import StageJournal
+from src.script.manifest import MediaManifest, get_media_manifest, remove_from_media_manifest, update_media_manifest
+from src.script.metrics import metrics, record_conversion
+from src.script.output import outputs
+from src.script.records import get_project_record
+from src.script.site_index import roadmap_sections, update_site_index
+from src.script.streaming import STAMP_FILE, STREAMS_DIR, create_video_stream, get_website_streams, stream_is_current
+from src.script.sync import sync_files
+from src.script.tracing import traced
 from src.script.utils import (
     convert_model_file,
     convert_video_file,
+    create_web_image,
+    format_bytes,
     get_project_media_files,
-    get_project_metadata,
     get_project_path,
     get_website_media_files,
-    is_project,
     load_personal_info,
-    resize_image_file,
+    release_temp_file,
 )
+from src.script.vcs import open_repository
+
+
+# Where media was staged before it moved out of the website repository
+LEGACY_STAGING_DIR = '.staging'
 
 
 class WebsiteHandler(Channel):
@@ -32,6 +46,8 @@ class WebsiteHandler(Channel):
         }
             
         super().__init__(**init)
+        # Image bytes before/after web encoding, summed over a stage run
+        self.image_bytes = {'source': 0, 'output': 0}
         
     def get_commands(self):
         """Return commands supported by Website handler"""
@@ -43,38 +59,83 @@ class WebsiteHandler(Channel):
     def handle_stage(self, **kwargs):
         """Handle stage command for website content"""
         projects = self.validate_projects(kwargs.get('projects', []))
-        staged_projects = self.stage_web(projects)
+        staged_projects = self.stage_web(projects, kwargs.get('hls', False), kwargs.get('resume', False), kwargs.get('refresh_index', False))
         return staged_projects
     
     def handle_publish(self, **kwargs):
         """Handle publish command for website content"""
         projects = self.validate_projects(kwargs.get('projects', []))
         commit_message = kwargs.get('commit_message', 'Update website content')
-        self.publish_web(projects, commit_message)
+        self.publish_web(projects, commit_message, kwargs.get('hls', False), kwargs.get('resume', False), kwargs.get('refresh_index', False))
         
-    def stage_web(self, projects: List[str]) -> List[str]:
-        """Stage website content for projects"""
+    def stage_web(self, projects: List[str], hls: bool = False, resume: bool = False, refresh_index: bool = False) -> List[str]:
+        """Stage website content for projects, journaling each step so an interrupted run can resume"""
         staged_projects = []
+        self.image_bytes = {'source': 0, 'output': 0}
+
+        # Staged media is always rebuilt, so leftovers from crashed runs are never needed
+        for stale_dir in (self.config.website_staging_dir, self.config.website_media_dir / LEGACY_STAGING_DIR):
+            if stale_dir.exists():
+                shutil.rmtree(stale_dir)
+
+        journal = StageJournal(self.config.cache_dir / 'journal' / 'website.jsonl')
+        completed = journal.begin([f"post:{name}" for name in projects] + ['pages'], resume)
+        if completed:
+            self.logger.info(f"Resuming website stage; skipping {len(completed)} completed steps")
+        failed = False
+
+        # Read and written once for the whole run rather than once per project
+        manifest = get_media_manifest(self)
+
         for name in projects:
+            step = f"post:{name}"
+            if step in completed:
+                staged_projects.append(name)
+                # The interrupted run may have died before saving the manifest
+                try:
+                    update_media_manifest(self, name, manifest)
+                except Exception as e:
+                    self.logger.error(f"Failed to update media manifest for {name}: {e}")
+                continue
             try:
-                result = self.stage_post(name)
+                journal.start(step)
+                result = self.stage_post(name, hls, manifest)
+                journal.complete(step)
                 if result:
                     staged_projects.append(result)
             except Exception as e:
+                failed = True
                 self.logger.error(f"Failed to stage website content for {name}: {e}")
 
         try:
-            self.stage_pages()
+            manifest.save()
         except Exception as e:
-            self.logger.error(f"Failed to stage website pages: {e}")
+            failed = True
+            self.logger.error(f"Failed to save media manifest: {e}")
+
+        if 'pages' not in completed:
+            try:
+                journal.start('pages')
+                self.stage_pages(refresh_index)
+                journal.complete('pages')
+            except Exception as e:
+                failed = True
+                self.logger.error(f"Failed to stage website pages: {e}")
+
+        # Left open after failures so --resume retries only what did not complete
+        if not failed:
+            journal.finish()
+
+        if self.image_bytes['source']:
+            self.logger.info(f"Website images: {self.describe_savings(**self.image_bytes)} in total")
 
         return [p for p in staged_projects if p.strip()]
         
-    def publish_web(self, projects: List[str], commit_message: str) -> None:
+    def publish_web(self, projects: List[str], commit_message: str, hls: bool = False, resume: bool = False, refresh_index: bool = False) -> None:
         """Publish website content for projects"""
         try:
             # First stage all content
-            staged_projects = self.stage_web(projects)
+            staged_projects = self.stage_web(projects, hls, resume, refresh_index)
             
             # Then publish changes
             if staged_projects:
@@ -86,15 +147,15 @@ class WebsiteHandler(Channel):
         except Exception as e:
             self.logger.error(f"Failed to publish website: {e}")
 
+    @traced('project')
     def publish(self, commit_message) -> None:
         try:
-            os.chdir(self.config.website_dir)
-            result = subprocess.run(['git', 'status', '--porcelain'], capture_output=True, text=True)
+            repo = open_repository(self, self.config.website_dir)
             
-            if result.stdout.strip():
-                subprocess.run(['git', 'add', '.'], check=True)
-                subprocess.run(['git', 'commit', '-m', commit_message], check=True)
-                subprocess.run(['git', 'push', 'origin', 'main'], check=True)
+            if repo.is_dirty():
+                repo.add_all()
+                repo.commit(commit_message)
+                repo.push('origin', 'main')
                 self.logger.info("Published website changes")
             else:
                 self.logger.info("No changes to publish for website")
@@ -110,19 +171,28 @@ class WebsiteHandler(Channel):
         except Exception as e:
             self.logger.error(f"Failed to stage website content for {name}: {e}")
 
-    def stage_post(self, name: str) -> str:
+    @traced('project', label='project')
+    def stage_post(self, name: str, hls: bool = False, manifest: Optional[MediaManifest] = None) -> str:
        
         try:
-            metadata = get_project_metadata(self, name)
-                
-            self.stage_media(name)
-            embed_content = self.stage_embed_content(name)
+            record = get_project_record(self, name)
+
+            # Build media beside the live tree and move it in only once complete,
+            # so a crash never leaves the site with half-converted media
+            staging_dir = self.media_staging_dir(name)
+            self.stage_media(name, staging_dir)
+            embed_content = self.stage_embed_content(name, staging_dir)
+            if hls:
+                self.stage_streams(name, staging_dir)
+            self.swap_staged_media(name, staging_dir)
+
+            # The manifest and post describe the media now live
+            update_media_manifest(self, name, manifest)
             
             post = self.generate_post(name, embed_content)
-            post_date = metadata['project']['date_created']
+            post_date = record.date_created
             post_path = self.config.website_posts_dir / f"{post_date}-{name}.md"
-            with open(post_path, 'w') as f:
-                f.write(post)
+            outputs.write(post_path, post)
 
             self.logger.info(f"Successfully staged website content for {name}")
 
@@ -131,31 +201,34 @@ class WebsiteHandler(Channel):
             self.logger.error(f"Failed to stage website content for {name}: {e}")
             raise
 
-    def stage_pages(self):
+    @traced('project')
+    def stage_pages(self, refresh_index: bool = False):
 
-        metadatas = []
-        for item in self.config.base_dir.iterdir():
-            if is_project(self, item):
-                metadata = self.tp.process_project_metadata(item.name)
-                metadatas.append(metadata)
+        sections = roadmap_sections(update_site_index(self, rebuild=refresh_index))
 
-        about = self.generate_about_page()
-        with open(self.config.website_pages_dir / 'about.md', 'w') as f:
-            f.write(about)
+        pages = {
+            'about.md': self.generate_about_page(),
+            'roadmap.md': self.generate_roadmap_page(sections),
+            'links.md': self.generate_links_page(sections),
+        }
+        for file_name, page in pages.items():
+            outputs.write(self.config.website_pages_dir / file_name, page)
 
+    @traced('project', label='project')
     def generate_post(self, name, embed_content) -> None:
         try:
-            metadata = self.tp.process_project_metadata(name)            
+            record = get_project_record(self, name)
 
             front_matter = {
                 'layout': 'post',
-                'date': metadata['project']['date_created'],
-                'featured': metadata['project']['feature_post'],
+                'date': record.date_created,
+                'featured': record.feature_post,
                 'images':get_website_media_files(self, name, Media.IMAGES.TYPE),
                 'videos':get_website_media_files(self, name, Media.VIDEOS.TYPE),
                 'models':get_website_media_files(self, name, Media.MODELS.TYPE),
             }
-            front_matter = front_matter | metadata['project']
+            front_matter = front_matter | get_website_streams(self, name)
+            front_matter = front_matter | record.project_fields()
             front_matter = front_matter | embed_content 
             front_matter = front_matter | self.determine_featured_content(name)
 
@@ -178,16 +251,83 @@ class WebsiteHandler(Channel):
             self.logger.error(f"Failed to generate about page: {e}")
             raise
 
-    def stage_media(self, name: str) -> None:
+    def generate_page(self, title: str, permalink: str, template: str, fields: Dict) -> str:
+        front_matter = {
+            'layout': 'page',
+            'title': title,
+            'permalink': permalink,
+            'website': self.config.website_domain,
+        } | fields
+        return f"---\n{yaml.dump(front_matter, default_flow_style=False, sort_keys=False, allow_unicode=True)}---\n{template}"
+
+    def generate_roadmap_page(self, sections: Dict) -> str:
+        try:
+            fields = {key: sections[key] for key in ('in_progress', 'backlog', 'complete_art', 'complete_other')}
+            roadmap = self.generate_page('Roadmap', '/roadmap/', self.tp.get_roadmap_template(), fields)
+            self.logger.info("Generated roadmap")
+            return roadmap
+        except Exception as e:
+            self.logger.error(f"Failed to generate roadmap page: {e}")
+            raise
+
+    def generate_links_page(self, sections: Dict) -> str:
+        try:
+            fields = {key: sections[key] for key in ('featured_projects', 'in_progress')}
+            links = self.generate_page('Links', '/links/', self.tp.get_links_template(), fields)
+            self.logger.info("Generated links")
+            return links
+        except Exception as e:
+            self.logger.error(f"Failed to generate links page: {e}")
+            raise
+
+    def media_staging_dir(self, name: str) -> Path:
+        """Where a project's media is built before being moved into the live site"""
+        return self.config.website_staging_dir / name
+
+    def swap_staged_media(self, name: str, staging_dir: Path) -> None:
+        """
+        Move a project's fully staged media folders into the live site. Live files whose
+        bytes are unchanged are kept as they are, so git and Jekyll see no change.
+        """
+        live_dir = self.config.website_media_dir / name
+
+        for staged_type_dir in sorted(staging_dir.iterdir()):
+            live_type_dir = live_dir / staged_type_dir.name
+            live_type_dir.mkdir(parents=True, exist_ok=True)
+
+            staged_files = {path.relative_to(staged_type_dir) for path in staged_type_dir.rglob('*') if path.is_file()}
+            # Stream stamps go last, so an interrupted swap never marks a stream complete
+            for rel_path in sorted(staged_files, key=lambda p: (p.name == STAMP_FILE, p)):
+                (live_type_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+                outputs.replace(staged_type_dir / rel_path, live_type_dir / rel_path)
+
+            # Media no longer published
+            for root, dirs, files in os.walk(live_type_dir, topdown=False):
+                for file_name in files:
+                    path = Path(root) / file_name
+                    if path.relative_to(live_type_dir) not in staged_files:
+                        path.unlink()
+                if Path(root) != live_type_dir and not os.listdir(root):
+                    os.rmdir(root)
+            shutil.rmtree(staged_type_dir)
+
+        staging_dir.rmdir()
+
+    @traced('project', label='project')
+    def stage_media(self, name: str, output_dir: Path) -> None:
         try:
-            output_dir = self.config.website_media_dir / name
+            image_bytes = {'source': 0, 'output': 0}
+            # Leftovers from an interrupted run
+            if output_dir.exists():
+                shutil.rmtree(output_dir)
                 
             for media in [Media.IMAGES, Media.VIDEOS, Media.MODELS, Media.EMBEDS]:
-                media_files = get_project_media_files(self, name, media.TYPE)
+                if media.TYPE == Media.IMAGES.TYPE:
+                    media_files = get_publishable_images(self, name)
+                else:
+                    media_files = get_project_media_files(self, name, media.TYPE)
 
                 output_type_dir = output_dir / str(media.TYPE)
-                if output_type_dir.exists():
-                    shutil.rmtree(output_type_dir)
                 output_type_dir.mkdir(parents=True, exist_ok=True)
 
                 if media_files:                    
@@ -199,7 +339,9 @@ class WebsiteHandler(Channel):
                         cleanup_source = True
                         
                         if media.TYPE == Media.IMAGES.TYPE:
-                            source_file = resize_image_file(self, file, 1920, 1080)
+                            source_file = create_web_image(self, file, 1920, 1080, self.config.website_image_quality)
+                            image_bytes['source'] += file.stat().st_size
+                            image_bytes['output'] += source_file.stat().st_size
                         elif media.TYPE == Media.VIDEOS.TYPE:
                             source_file = convert_video_file(self, file, 'mp4')
                         elif media.TYPE == Media.MODELS.TYPE:
@@ -210,26 +352,62 @@ class WebsiteHandler(Channel):
                         
                         dest_path = output_type_dir / source_file.name
                         shutil.copy2(source_file, dest_path)
+                        record_conversion(media.TYPE, file, dest_path)
                         
                         if cleanup_source:
-                            source_file.unlink()
+                            release_temp_file(source_file)
+
+
+            if image_bytes['source']:
+                saved = image_bytes['source'] - image_bytes['output']
+                metrics.inc('luna_image_bytes_saved_total', saved, project=name)
+                self.logger.info(f"Images for {name}: {self.describe_savings(**image_bytes)}")
+                for key, value in image_bytes.items():
+                    self.image_bytes[key] += value
 
-                
             self.logger.info(f"Successfully staged all website media files for {name}")
         except Exception as e:
             self.logger.error(f"Failed to stage media for {name}: {e}")
             raise
 
-    def stage_embed_content(self, name):
+    @staticmethod
+    def describe_savings(source: int, output: int) -> str:
+        saved = source - output
+        return f"saved {format_bytes(saved)} of {format_bytes(source)} ({saved / source:.0%})"
+
+    @traced('project', label='project')
+    def stage_streams(self, name: str, output_dir: Path) -> None:
+        """Stage HLS renditions, posters and scrub sprites for a project's videos into output_dir"""
+        try:
+            live_streams_dir = self.config.website_media_dir / name / STREAMS_DIR
+            streams_dir = output_dir / STREAMS_DIR
+            streams_dir.mkdir(parents=True, exist_ok=True)
+
+            for video in get_project_media_files(self, name, Media.VIDEOS.TYPE):
+                live_stream_dir = live_streams_dir / video.stem
+                if stream_is_current(video, live_stream_dir):
+                    # Hardlink the live stream in rather than re-encoding it
+                    plan = {str(path.relative_to(live_stream_dir)): path for path in live_stream_dir.rglob('*') if path.is_file()}
+                    sync_files(plan, streams_dir / video.stem, hardlink=True)
+                elif create_video_stream(self, video, streams_dir / video.stem):
+                    self.logger.info(f"Staged stream for {video.name}")
+
+            self.logger.info(f"Successfully staged video streams for {name}")
+        except Exception as e:
+            self.logger.error(f"Failed to stage video streams for {name}: {e}")
+            raise
+
+    @traced('project', label='project')
+    def stage_embed_content(self, name, output_dir: Path):
         try:
-            metadata = get_project_metadata(self, name)
+            record = get_project_record(self, name)
             project_dir = get_project_path(self, name)
 
-            output_embed_dir = self.config.website_media_dir / name / Media.EMBEDS.TYPE
+            output_embed_dir = output_dir / Media.EMBEDS.TYPE
 
             embeds = {}
 
-            for embed in metadata['project']['embeds']:
+            for embed in record.embeds:
                 if embed['source'] and embed['type']:
                     source_file = Path(project_dir) / Path(embed['source'])
                     dest_path =  output_embed_dir / Path(embed['source']).name
@@ -250,10 +428,10 @@ class WebsiteHandler(Channel):
             raise
 
     def determine_featured_content(self, name) -> Dict:
-        metadata = get_project_metadata(self, name)
+        record = get_project_record(self, name)
         project_dir = get_project_path(self, name)
 
-        featured_content = metadata['project']['featured_content']
+        featured_content = record.featured_content
         if featured_content.get('type') == 'code':            
             source_file = Path(project_dir) / Path(featured_content['source'])
             if source_file.exists():
@@ -299,6 +477,7 @@ class WebsiteHandler(Channel):
             media_dir = self.config.website_media_dir / name
             if media_dir.exists():
                 shutil.rmtree(self.config.website_media_dir / name)
+            remove_from_media_manifest(self, name)
             self.logger.info(f"Deleted website files for {name}")
         except Exception as e:
             self.logger.error(f"Failed to delete website files for {name}: {e}")
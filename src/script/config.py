@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from pathlib import Path
 
+PERSONAL_INFO_FILE = Path(__file__).resolve().parent.parent / 'personal-info.yml'
+
 
 @dataclass
 class Config:
@@ -16,11 +18,21 @@ class Config:
     website_media: str
     website_pages: str
     things3_area: str
+    dedupe_images: str = 'off'
+    dedupe_threshold: float = 10
+    website_image_quality: int = 82
+    image_backend: str = 'auto'
+    git_backend: str = 'auto'
+    personal_info_file: Path = PERSONAL_INFO_FILE
 
     @property
     def github_url_path(self) -> str:
         return f"https://github.com/{self.github_username}"
 
+    @property
+    def cache_dir(self) -> Path:
+        return self.base_dir / '_cache'
+
     @property
     def website_posts_dir(self) -> Path:
         return self.website_dir / self.website_posts
@@ -31,4 +43,9 @@ class Config:
 
     @property
     def website_pages_dir(self) -> Path:
-        return self.website_dir / self.website_pages
\ No newline at end of file
+        return self.website_dir / self.website_pages
+
+    @property
+    def website_staging_dir(self) -> Path:
+        # Beside the website repository: outside its working tree, but on the same filesystem
+        return self.website_dir.parent / f".{self.website_dir.name}-staging"
\ No newline at end of file
@@ -21,7 +21,7 @@ class MediaPropertiesCollector(type):
         return new_cls
 
 class Media(metaclass=MediaPropertiesCollector):
-    IMAGES = MediaProperties('images', ("*.png","*.jpg","*.jpeg", "*.JPG", "*.JPEG"))
+    IMAGES = MediaProperties('images', ("*.png","*.jpg","*.jpeg", "*.JPG", "*.JPEG", "*.tif", "*.tiff", "*.TIF", "*.TIFF"))
     VIDEOS = MediaProperties('videos', ("*.mov","*.mp4"))
     MODELS = MediaProperties('models', ("*.stl",))
     AUDIO = MediaProperties('audio', ("*.mp3", "*.wav"))
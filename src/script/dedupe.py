@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from src.script.constants import Media
+from src.script.imaging import get_image_backend
+from src.script.records import get_project_record
+from src.script.utils import get_project_media_files
+
+DEDUPE_MODES = ('off', 'flag', 'skip')
+HASH_SIZE = 8
+PHASH_SIZE = 32
+# Bump when hashing changes so cached hashes are recomputed
+HASH_VERSION = 2
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+
+def _pack(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), 'big')
+
+
+def dhash(gray: Image.Image) -> int:
+    """Difference hash: whether each pixel is brighter than its right neighbour"""
+    pixels = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS), dtype=np.int16)
+    return _pack(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(gray: Image.Image) -> int:
+    """Perceptual hash: low DCT frequencies compared against their median"""
+    pixels = np.asarray(gray.resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.LANCZOS), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    return _pack(low > np.median(low.ravel()[1:]))
+
+
+def image_hashes(path: Path, backend) -> Dict:
+    width, height = backend.dimensions(path)
+    # Hashes only need a thumbnail, which the backend can shrink while decoding
+    gray = backend.load_fitted(path, PHASH_SIZE * 2, PHASH_SIZE * 2).convert('L')
+    return {'dhash': f"{dhash(gray):016x}", 'phash': f"{phash(gray):016x}", 'pixels': width * height}
+
+
+def hamming_matrix(hashes: List[str]) -> np.ndarray:
+    """Pairwise bit distances between 64-bit hex hashes"""
+    values = np.array([int(h, 16) for h in hashes], dtype=np.uint64)
+    xor = np.bitwise_xor.outer(values, values)
+    return np.unpackbits(xor.view(np.uint8).reshape(len(values), len(values), 8), axis=-1).sum(axis=-1)
+
+
+class ImageHashIndex:
+    """Per-project hashes persisted as JSON, recomputed only for new or modified images"""
+
+    def __init__(self, path: Path, backend):
+        self.path = Path(path)
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+
+    def hashes(self, image: Path) -> Dict:
+        stat = image.stat()
+        signature = [stat.st_size, stat.st_mtime_ns, HASH_VERSION]
+        entry = self.entries.get(image.name)
+        if entry is None or entry['signature'] != signature:
+            entry = image_hashes(image, self.backend) | {'signature': signature}
+            self.entries[image.name] = entry
+        return entry
+
+    def save(self, keep: List[str]) -> None:
+        """Write the index, dropping images no longer in the project"""
+        with self._lock:
+            self.entries = {name: entry for name, entry in self.entries.items() if name in keep}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f".{self.path.name}.tmp")
+            with open(temp_path, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(temp_path, self.path)
+
+
+@dataclass
+class Duplicate:
+    image: Path
+    kept: Path
+    distance: float
+
+
+def find_duplicates(self, name: str, images: Optional[List[Path]] = None, prefer: Optional[str] = None) -> List[Duplicate]:
+    """
+    Group a project's images whose average dHash/pHash distance is within the
+    configured threshold. The highest-resolution image of each group is kept,
+    or the image whose name is `prefer` (e.g. the featured image).
+    """
+    images = sorted(images if images is not None else get_project_media_files(self, name, Media.IMAGES.TYPE))
+    if len(images) < 2:
+        return []
+
+    index = ImageHashIndex(self.config.cache_dir / 'dedupe' / f"{name}.json", get_image_backend(self))
+    entries = [index.hashes(image) for image in images]
+    index.save([image.name for image in images])
+
+    distance = (hamming_matrix([e['dhash'] for e in entries]) + hamming_matrix([e['phash'] for e in entries])) / 2
+    close = distance <= self.config.dedupe_threshold
+
+    # Connected components over the "near-duplicate" graph
+    group = list(range(len(images)))
+    def root(i):
+        while group[i] != i:
+            group[i] = group[group[i]]
+            i = group[i]
+        return i
+    for i, j in zip(*np.nonzero(np.triu(close, k=1))):
+        group[root(int(i))] = root(int(j))
+
+    components: Dict[int, List[int]] = {}
+    for i in range(len(images)):
+        components.setdefault(root(i), []).append(i)
+
+    duplicates = []
+    for members in components.values():
+        if len(members) < 2:
+            continue
+        kept = max(members, key=lambda i: (images[i].name == prefer, entries[i]['pixels'], images[i].stat().st_size))
+        for i in members:
+            if i != kept:
+                duplicates.append(Duplicate(images[i], images[kept], float(distance[i, kept])))
+
+    return duplicates
+
+
+def get_publishable_images(self, name: str) -> List[Path]:
+    """Project images, with near-duplicates flagged or dropped according to DEDUPE_IMAGES"""
+    images = get_project_media_files(self, name, Media.IMAGES.TYPE)
+    mode = self.config.dedupe_images
+    if mode not in DEDUPE_MODES:
+        raise ValueError(f"DEDUPE_IMAGES must be one of {', '.join(DEDUPE_MODES)}, not '{mode}'")
+    if mode == 'off':
+        return images
+
+    # Never drop the featured image in favour of a near copy
+    featured_content = get_project_record(self, name).featured_content or {}
+    prefer = Path(featured_content['source']).name if featured_content.get('type') == 'image' else None
+
+    duplicates = find_duplicates(self, name, images, prefer)
+    for duplicate in duplicates:
+        action = 'Skipping' if mode == 'skip' else 'Found'
+        self.logger.warning(f"{action} near-duplicate image {duplicate.image.name} of {duplicate.kept.name} in {name} (distance {duplicate.distance:g})")
+
+    if mode == 'skip':
+        skipped = {duplicate.image for duplicate in duplicates}
+        images = [image for image in images if image not in skipped]
+    return images
@@ -0,0 +1,121 @@
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+from PIL import Image, ImageOps
+
+IMAGE_BACKENDS = ('auto', 'vips', 'pillow')
+# EXIF orientations that swap width and height
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+ORIENTATION_TAG = 0x0112
+VIPS_MODES = {1: 'L', 2: 'LA', 3: 'RGB', 4: 'RGBA'}
+
+
+def fit_size(width: int, height: int, max_width: int = -1, max_height: int = -1, upscale: bool = False) -> Tuple[int, int]:
+    """Largest size with the same aspect ratio that fits the maximums (-1 for no limit)"""
+    width_ratio = 1 if max_width == -1 else max_width / width
+    height_ratio = 1 if max_height == -1 else max_height / height
+    scale_ratio = min(width_ratio, height_ratio)
+    if not upscale:
+        scale_ratio = min(scale_ratio, 1)
+    return max(1, int(width * scale_ratio)), max(1, int(height * scale_ratio))
+
+
+class PillowBackend:
+    """Decodes the whole image, except that JPEGs are reduced by the decoder (draft mode)"""
+
+    name = 'pillow'
+
+    def dimensions(self, path) -> Tuple[int, int]:
+        with Image.open(path) as img:
+            width, height = img.size
+            if img.getexif().get(ORIENTATION_TAG) in TRANSPOSED_ORIENTATIONS:
+                return height, width
+            return width, height
+
+    def load_fitted(self, path, max_width: int = -1, max_height: int = -1, upscale: bool = False) -> Image.Image:
+        """Upright image scaled to fit the maximums, keeping its mode and ICC profile"""
+        with Image.open(path) as img:
+            transposed = img.getexif().get(ORIENTATION_TAG) in TRANSPOSED_ORIENTATIONS
+            width, height = img.size[::-1] if transposed else img.size
+            target = fit_size(width, height, max_width, max_height, upscale)
+
+            img.draft(None, target[::-1] if transposed else target)
+            img = ImageOps.exif_transpose(img)
+            if img.size != target:
+                img = img.resize(target, Image.Resampling.LANCZOS)
+            else:
+                img.load()
+            return img
+
+
+class VipsBackend:
+    """
+    libvips streams the source through a demand-driven pipeline and shrinks on load,
+    so memory follows the output size rather than the source size.
+    """
+
+    name = 'vips'
+
+    def __init__(self):
+        import pyvips
+        self.pyvips = pyvips
+
+    def _header(self, path):
+        # Opening only reads the header; pixels are decoded on demand
+        return self.pyvips.Image.new_from_file(str(path), access='sequential')
+
+    def _is_transposed(self, image) -> bool:
+        if image.get_typeof('orientation') == 0:
+            return False
+        return image.get('orientation') in TRANSPOSED_ORIENTATIONS
+
+    def dimensions(self, path) -> Tuple[int, int]:
+        image = self._header(path)
+        if self._is_transposed(image):
+            return image.height, image.width
+        return image.width, image.height
+
+    def load_fitted(self, path, max_width: int = -1, max_height: int = -1, upscale: bool = False) -> Image.Image:
+        """Upright sRGB image scaled to fit the maximums, as a Pillow image"""
+        width, height = self.dimensions(path)
+        target_width, target_height = fit_size(width, height, max_width, max_height, upscale)
+
+        image = self.pyvips.Image.thumbnail(
+            str(Path(path)),
+            target_width,
+            height=target_height,
+            size='both' if upscale else 'down',
+            export_profile='srgb',
+        )
+        if image.interpretation not in ('srgb', 'b-w'):
+            image = image.colourspace('srgb' if image.bands >= 3 else 'b-w')
+        if image.format != 'uchar':
+            image = image.cast('uchar')
+
+        return Image.frombytes(VIPS_MODES[image.bands], (image.width, image.height), image.write_to_memory())
+
+
+_backends: Dict[str, object] = {}
+_backends_lock = threading.Lock()
+
+
+def get_image_backend(self):
+    """Backend selected by IMAGE_BACKEND: vips, pillow, or auto (vips when pyvips is installed)"""
+    choice = self.config.image_backend
+    if choice not in IMAGE_BACKENDS:
+        raise ValueError(f"IMAGE_BACKEND must be one of {', '.join(IMAGE_BACKENDS)}, not '{choice}'")
+
+    with _backends_lock:
+        if choice not in _backends:
+            if choice == 'pillow':
+                _backends[choice] = PillowBackend()
+            else:
+                try:
+                    _backends[choice] = VipsBackend()
+                except (ImportError, OSError) as e:
+                    if choice == 'vips':
+                        self.logger.error(f"IMAGE_BACKEND=vips but pyvips could not be loaded: {e}")
+                        raise
+                    _backends[choice] = PillowBackend()
+        return _backends[choice]
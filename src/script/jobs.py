@@ -0,0 +1,102 @@
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import yaml
+
+from src.script.utils import setup_logging
+
+
+@dataclass
+class JobResult:
+    name: str
+    status: str
+    seconds: float
+    errors: int = 0
+    message: str = ''
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+
+class ErrorCounter(logging.Handler):
+    """Counts error records logged while a job runs, since handlers log failures instead of raising"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+
+
+def load_jobs(job_file: Path) -> Dict:
+    with open(job_file, 'r') as f:
+        spec = yaml.safe_load(f) or {}
+
+    jobs = []
+    for job in spec.get('jobs') or []:
+        # Accept CLI spellings such as all-projects or commit-message
+        job = {str(k).replace('-', '_'): v for k, v in job.items()}
+        for key in ('projects', 'channels'):
+            if isinstance(job.get(key), str):
+                job[key] = [job[key]]
+        jobs.append(job)
+
+    return {'jobs': jobs, 'stop_on_failure': spec.get('stop_on_failure', False)}
+
+
+def job_name(job: Dict) -> str:
+    if job.get('name'):
+        return job['name']
+    channels = job.get('channels') or ([job['channel']] if job.get('channel') else [])
+    return ' '.join([job.get('command', '?')] + list(channels))
+
+
+def run_jobs(channels, job_file, defaults: Dict, run_command: Callable) -> bool:
+    """
+    Run each job in job_file with the same registry, so imports, templates, the
+    project catalog and media caches are shared. Returns True if every job succeeded.
+    """
+    logger = setup_logging(__name__)
+    spec = load_jobs(Path(job_file).expanduser())
+    results: List[JobResult] = []
+
+    for job in spec['jobs']:
+        name = job_name(job)
+        options = defaults | {k: v for k, v in job.items() if k != 'name'}
+
+        counter = ErrorCounter()
+        root_logger = logging.getLogger()
+        root_logger.addHandler(counter)
+        start = time.perf_counter()
+        logger.info(f"Running job '{name}'")
+
+        try:
+            if 'command' not in options:
+                raise ValueError("Job has no command")
+            run_command(channels, options)
+            status = 'ok' if counter.count == 0 else 'errors'
+            message = ''
+        except Exception as e:
+            status = 'failed'
+            message = str(e)
+            logger.error(f"Job '{name}' failed: {e}")
+        finally:
+            root_logger.removeHandler(counter)
+
+        results.append(JobResult(name, status, time.perf_counter() - start, counter.count, message))
+
+        if status != 'ok' and spec['stop_on_failure']:
+            logger.warning("Stopping after failed job (stop_on_failure)")
+            break
+
+    logger.info(f"\n -- Ran {len(results)} of {len(spec['jobs'])} jobs: --")
+    for result in results:
+        detail = f" ({result.errors} errors logged)" if result.errors else ''
+        logger.info(f"[{result.status}] {result.name} in {result.seconds:.1f}s{detail}")
+
+    return len(results) == len(spec['jobs']) and all(result.ok for result in results)
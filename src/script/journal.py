@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Set
+
+
+class StageJournal:
+    """
+    Append-only JSONL write-ahead log of a staging run's steps.
+
+    A run writes a `plan` record, then `start`/`done` records per step, and a
+    `finish` record at the end. A run without `finish` was interrupted; resuming
+    it skips the steps it already completed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.run_id = None
+        self._lock = threading.Lock()
+
+    def _read(self) -> List[dict]:
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn line from a crash mid-write
+                    continue
+        return records
+
+    def _append(self, event: str, **fields) -> None:
+        record = {'event': event, 'run': self.run_id, 'time': time.time(), **fields}
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def interrupted_steps(self) -> Set[str]:
+        """Steps completed by the last run if it never finished, else an empty set"""
+        records = self._read()
+        plans = [i for i, record in enumerate(records) if record['event'] == 'plan']
+        if not plans:
+            return set()
+        run = records[plans[-1]:]
+        if any(record['event'] == 'finish' for record in run):
+            return set()
+        # A resumed run carries over what the runs before it completed
+        return set(run[0].get('resumed', [])) | {record['step'] for record in run if record['event'] == 'done'}
+
+    def begin(self, steps: List[str], resume: bool = False) -> Set[str]:
+        """Start a run of steps and return the ones to skip (when resuming an interrupted run)"""
+        completed = self.interrupted_steps() if resume else set()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if completed:
+            # Rewrite without any torn line so new records start on a line of their own
+            temp_path = self.path.with_name(f".{self.path.name}.tmp")
+            with open(temp_path, 'w') as f:
+                f.writelines(json.dumps(record) + "\n" for record in self._read())
+            os.replace(temp_path, self.path)
+        else:
+            self.path.unlink(missing_ok=True)
+        self.run_id = uuid.uuid4().hex
+        self._append('plan', steps=steps, resumed=sorted(completed))
+        return completed
+
+    def start(self, step: str) -> None:
+        self._append('start', step=step)
+
+    def complete(self, step: str) -> None:
+        self._append('done', step=step)
+
+    def finish(self) -> None:
+        self._append('finish')
@@ -6,6 +6,7 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+from src.script.archive import ARCHIVE_FORMATS
 from src.script.channels._registry import ChannelRegistry
 from src.script.channels.github import GithubHandler
 from src.script.channels.instagram import InstagramHandler
@@ -14,6 +15,10 @@ from src.script.channels.project import ProjectHandler
 from src.script.channels.raw import RawHandler
 from src.script.channels.website import WebsiteHandler
 from src.script.config import Config
+from src.script.jobs import run_jobs
+from src.script.metrics import enable_metrics, write_metrics
+from src.script.tracing import enable_tracing, write_trace
+from src.script.utils import setup_logging
 
 load_dotenv()
 
@@ -46,11 +51,15 @@ def setup_channel_registry(config):
     
     return registry
 
-def parse_arguments():
+# Options that select commands, channels and projects rather than being passed to handlers
+SELECTION_ARGS = ['command', 'channels', 'all_channels', 'projects', 'all_projects', 'channel', 'trace', 'metrics_file', 'job_file']
+
+def build_parser():
     parser = argparse.ArgumentParser(description='Project Management and Publication Tool')
     
     # Main command argument
-    parser.add_argument('command', help='Command to execute: create, list, rename, delete, init, stage, publish')
+    parser.add_argument('command', help='Command to execute: create, list, rename, delete, duplicates, init, stage, publish, submit, run')
+    parser.add_argument('job_file', nargs='?', help='YAML file of jobs to execute with the run command')
     
     # Channel to operate on
     parser.add_argument('--channel', '-ch', help='Channel to use (github, web, pdf, instagram, raw, project)')
@@ -69,24 +78,45 @@ def parse_arguments():
     parser.add_argument('--max-width', '-mw', help='Max width for images when generating separate image files for PDF publication')
     parser.add_argument('--max-height', '-mh', help='Max height for images when generating separate image files for PDF publication')
     parser.add_argument('--filename-prepend', '-fp', default='', help='Prepend string for PDF filename')
+    parser.add_argument('--submissions', '-s', help='YAML spec of PDF submissions to generate in one run (submit command)')
+
+    # Raw-specific arguments
+    parser.add_argument('--checksum', action='store_true', help='Compare file hashes instead of size and mtime when syncing raw exports')
+    parser.add_argument('--hardlink', action='store_true', help='Hardlink raw export files to their sources instead of copying')
+    parser.add_argument('--format', choices=list(ARCHIVE_FORMATS), help='Stream raw exports into a single archive instead of a folder')
+    parser.add_argument('--archive-name', help='Archive file name (without extension) for raw exports')
 
     # GitHub-specific arguments
     parser.add_argument('--commit-message','-cm', default='', help='Commit message for publishing to github')
 
+    # Website-specific arguments
+    parser.add_argument('--hls', action='store_true', help='Also stage HLS streams, poster frames and scrub sprites for website videos')
+    parser.add_argument('--resume', action='store_true', help='Continue an interrupted website stage, skipping steps it completed')
+    parser.add_argument('--refresh-index', action='store_true', help='Rebuild every site index entry, re-checking GitHub visibility')
+
     # Instagram-specific arguments
     parser.add_argument('--caption','-ca', default='', help='Caption for Instagram post. Defaults to project tagline.')
     
+    # Scheduling
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Maximum number of channel/project tasks to run concurrently')
+
+    # Diagnostics
+    parser.add_argument('--trace', help='Write a Chrome/Perfetto trace of the run to this JSON file')
+    parser.add_argument('--metrics-file', help='Write run metrics as a Prometheus/OpenMetrics textfile (e.g. for node-exporter)')
+
     # List projects sorting/filtering
     parser.add_argument('--sort-by', choices=['name', 'date', 'priority', 'status'], default='name', 
                          help='Sort projects by this field when listing')
     parser.add_argument('--status', choices=['backlog', 'in_progress', 'complete', 'archive'], 
                          help='Filter projects by status when listing')
     
-    return parser.parse_args()
+    return parser
 
-def main():
-    args = parse_arguments()
-    config = Config(
+def parse_arguments():
+    return build_parser().parse_args()
+
+def build_config():
+    return Config(
         base_dir=Path(os.environ.get('PROJECT_BASE_DIR')),
         website_domain=os.environ.get('WEBSITE_DOMAIN'),
         github_username=os.environ.get('GITHUB_USERNAME'),
@@ -98,57 +128,101 @@ def main():
         instagram_username=(os.environ.get('INSTAGRAM_USERNAME')),
         instagram_password=(os.environ.get('INSTAGRAM_PASSWORD')),
         enable_things3=os.environ.get('ENABLE_THINGS3', 'false').lower() == 'true',
-        things3_area=os.environ.get('THINGS3_AREA', '')
+        things3_area=os.environ.get('THINGS3_AREA', ''),
+        dedupe_images=os.environ.get('DEDUPE_IMAGES', 'off').lower(),
+        dedupe_threshold=float(os.environ.get('DEDUPE_THRESHOLD', 10)),
+        website_image_quality=int(os.environ.get('WEBSITE_IMAGE_QUALITY', 82)),
+        image_backend=os.environ.get('IMAGE_BACKEND', 'auto').lower(),
+        git_backend=os.environ.get('GIT_BACKEND', 'auto').lower()
     )
+
+def run_command(channels, options):
+    """Execute one command described by CLI-style options. Raises ValueError on invalid input."""
+    command = options['command']
+    handler_options = {k: v for k, v in options.items() if k not in SELECTION_ARGS}
+
+    # Handle command execution through channel registry
+    if command in ['create', 'list', 'rename', 'delete', 'duplicates']:
+        # Project management commands always use the project channel
+        channels.command(
+            command=command, 
+            channels=['project'],
+            sort_by=options.get('sort_by'), 
+            status=options.get('status'),
+            projects=options.get('projects'),
+            all_projects=options.get('all_projects')
+        )
+    elif command == 'init':
+        # GitHub initialization if not done in project creation
+        if not options.get('projects') and not options.get('all_projects'):
+            raise ValueError("You must specify a project with --projects or use --all-projects")
+        channels.command(
+            command=command, 
+            channels=['github'], 
+            projects=options.get('projects'),
+            all_projects=options.get('all_projects'),
+            jobs=options.get('jobs')
+        )
+    elif command == 'submit':
+        # Batch PDF generation for several submissions
+        if not options.get('submissions'):
+            raise ValueError("You must specify a submissions file with --submissions")
+        channels.command(
+            command=command,
+            channels=['pdf'],
+            **handler_options
+        )
+    elif command in ['publish', 'stage']:
+        # Publishing commands
+        target_channels = options.get('channels') or ([options['channel']] if options.get('channel') else None)
+        channels.command(
+            command=command,
+            channels=target_channels,
+            all_channels=options.get('all_channels'),
+            projects=options.get('projects'),
+            all_projects=options.get('all_projects'),
+            **handler_options
+        )
+    else:
+        raise ValueError(f"Unknown command: {command}")
+
+def main():
+    args = parse_arguments()
+    config = build_config()
+    # Configure console logging before enable_metrics() adds its handler to the root logger
+    setup_logging(__name__)
     
+    if args.trace:
+        enable_tracing()
+    if args.metrics_file:
+        enable_metrics()
+
     channels = setup_channel_registry(config)
 
     try:
-        # Handle command execution through channel registry
-        if args.command in ['create', 'list', 'rename', 'delete']:
-            # Project management commands always use the project channel
-            channels.command(
-                command=args.command, 
-                channels=['project'],
-                sort_by=args.sort_by, 
-                status=args.status,
-                projects=args.projects,
-                all_projects=args.all_projects
-            )
-        elif args.command == 'init':
-            # GitHub initialization if not done in project creation
-            if not args.projects and not args.all_projects:
-                print("Error: You must specify a project with --projects or use --all-projects")
-                sys.exit(1)
-            channels.command(
-                command=args.command, 
-                channels=['github'], 
-                projects=args.projects,
-                all_projects=args.all_projects
-            )
-        elif args.command in ['publish', 'stage']:
-            # Publishing commands
-            target_channels = args.channels if args.channels else [args.channel] if args.channel else None
-            
-            try:
-                channels.command(
-                    command=args.command,
-                    channels=target_channels,
-                    all_channels=args.all_channels,
-                    projects=args.projects,
-                    all_projects=args.all_projects,
-                    **{k: v for k, v in vars(args).items() if k not in ['command', 'channels', 'all_channels', 'projects', 'all_projects', 'channel']}
-                )
-            except ValueError as e:
-                print(f"Command error: {e}")
+        if args.command == 'run':
+            # Run a file of jobs in this process, sharing handlers and caches
+            if not args.job_file:
+                raise ValueError("You must specify a job file, e.g. 'run jobs.yml'")
+            # Options given alongside `run` (e.g. --jobs, --resume) apply to every job
+            defaults = {k: v for k, v in vars(args).items() if k not in SELECTION_ARGS}
+            if not run_jobs(channels, args.job_file, defaults, run_command):
                 sys.exit(1)
         else:
-            print(f"Unknown command: {args.command}")
-            sys.exit(1)
-            
+            run_command(channels, vars(args))
+    except ValueError as e:
+        print(f"Command error: {e}")
+        sys.exit(1)
     except Exception as e:
         logging.error(f"Operation failed: {e}")
         sys.exit(1)
+    finally:
+        if args.trace:
+            write_trace(args.trace)
+            logging.info(f"Wrote trace to {args.trace}")
+        if args.metrics_file:
+            write_metrics(args.metrics_file)
+            logging.info(f"Wrote metrics to {args.metrics_file}")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
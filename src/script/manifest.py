@@ -0,0 +1,140 @@
+import base64
+import io
+import json
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image
+
+from src.script.constants import Media
+from src.script.imaging import get_image_backend
+from src.script.output import outputs
+from src.script.probe import probe_video
+from src.script.streaming import STREAMS_DIR
+from src.script.tracing import traced
+from src.script.utils import file_digest
+
+LQIP_WIDTH = 16
+LQIP_QUALITY = 40
+PALETTE_COLORS = 5
+
+
+def image_summary(path: Path, backend) -> Dict:
+    """Intrinsic size, dominant color and a tiny blurred-up JPEG placeholder"""
+    width, height = backend.dimensions(path)
+    thumb = backend.load_fitted(path, 64, 64).convert('RGB')
+
+    palette = thumb.quantize(PALETTE_COLORS)
+    _, index = max(palette.getcolors())
+    r, g, b = palette.getpalette()[index * 3:index * 3 + 3]
+
+    lqip = thumb.resize((LQIP_WIDTH, max(1, round(LQIP_WIDTH * height / width))), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    lqip.save(buffer, 'JPEG', quality=LQIP_QUALITY, optimize=True)
+
+    return {
+        'width': width,
+        'height': height,
+        'color': f"#{r:02x}{g:02x}{b:02x}",
+        'lqip': f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode()}",
+    }
+
+
+class MediaManifest:
+    """
+    `_data/media.json` in the website: staged media URLs mapped to their dimensions,
+    size and placeholder, so the theme can reserve layout space before media loads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+
+    def project_entries(self, name: str) -> Dict[str, Dict]:
+        prefix = f"/media/{name}/"
+        return {url: entry for url, entry in self.entries.items() if url.startswith(prefix)}
+
+    def replace_project(self, name: str, entries: Dict[str, Dict]) -> None:
+        with self._lock:
+            self.entries = {url: entry for url, entry in self.entries.items() if not url.startswith(f"/media/{name}/")}
+            self.entries.update(entries)
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            outputs.write_json(self.path, dict(sorted(self.entries.items())))
+
+
+def get_media_manifest(self) -> MediaManifest:
+    return MediaManifest(self.config.website_dir / '_data' / 'media.json')
+
+
+def _entry(path: Path, url: str, previous: Dict, summarize, depends_on: str = '') -> Dict:
+    digest = file_digest(path)[:16] + depends_on
+    old = previous.get(url)
+    if old and old.get('digest') == digest:
+        return old
+    return {'bytes': path.stat().st_size, 'digest': digest} | summarize(path)
+
+
+def _video_summary(path: Path, poster: Optional[Dict]) -> Dict:
+    probe = probe_video(path)
+    summary = {'width': probe.width, 'height': probe.height, 'duration': round(probe.duration, 2)}
+    if poster:
+        summary |= {'color': poster['color'], 'lqip': poster['lqip']}
+    return summary
+
+
+@traced('project', label='project')
+def update_media_manifest(self, name: str, manifest: Optional[MediaManifest] = None) -> None:
+    """
+    Refresh one project's manifest entries, re-reading only media whose contents changed.
+    A manifest passed in is updated in memory and left for the caller to save once.
+    """
+    media_dir = self.config.website_media_dir / name
+    save = manifest is None
+    if save:
+        manifest = get_media_manifest(self)
+    previous = manifest.project_entries(name)
+    summarize_image = partial(image_summary, backend=get_image_backend(self))
+    entries = {}
+
+    images_dir = media_dir / Media.IMAGES.TYPE
+    if images_dir.exists():
+        for image in sorted(images_dir.iterdir()):
+            url = f"/media/{name}/{Media.IMAGES.TYPE}/{image.name}"
+            entries[url] = _entry(image, url, previous, summarize_image)
+
+    posters = {}
+    streams_dir = media_dir / STREAMS_DIR
+    if streams_dir.exists():
+        for poster in sorted(streams_dir.glob('*/poster.jpg')):
+            url = f"/media/{name}/{STREAMS_DIR}/{poster.parent.name}/poster.jpg"
+            entries[url] = posters[poster.parent.name] = _entry(poster, url, previous, summarize_image)
+
+    videos_dir = media_dir / Media.VIDEOS.TYPE
+    if videos_dir.exists():
+        for video in sorted(videos_dir.iterdir()):
+            url = f"/media/{name}/{Media.VIDEOS.TYPE}/{video.name}"
+            poster = posters.get(video.stem)
+            # A new or changed poster also changes the video's placeholder
+            depends_on = f":{poster['digest']}" if poster else ''
+            entries[url] = _entry(video, url, previous, lambda path: _video_summary(path, poster), depends_on)
+
+    manifest.replace_project(name, entries)
+    if save:
+        manifest.save()
+    self.logger.info(f"Updated media manifest for {name} ({len(entries)} files)")
+
+
+def remove_from_media_manifest(self, name: str) -> None:
+    manifest = get_media_manifest(self)
+    if manifest.project_entries(name):
+        manifest.replace_project(name, {})
+        manifest.save()
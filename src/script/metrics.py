@@ -0,0 +1,173 @@
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+from src.script.tracing import add_span_listener
+
+# Media type produced by each traced conversion function
+CONVERSION_MEDIA_TYPES = {
+    'resize_image_file': 'images',
+    'convert_video_file': 'videos',
+    'convert_model_file': 'models',
+    'create_instagram_image': 'instagram',
+    'create_video_stream': 'streams',
+    'create_web_image': 'images',
+}
+
+
+class MetricsRegistry:
+    """In-memory counters and gauges rendered in the Prometheus/OpenMetrics text format."""
+
+    def __init__(self):
+        self.enabled = False
+        self._values: Dict[Tuple[str, Tuple], float] = {}
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        self._types[name] = metric_type
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def total(self, name: str) -> float:
+        """Sum of a metric across all label sets"""
+        with self._lock:
+            return sum(v for (n, _), v in self._values.items() if n == name)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            values = sorted(self._values.items())
+
+        current = None
+        for (name, labels), value in values:
+            if name != current:
+                current = name
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {self._types.get(name, 'untyped')}")
+            label_str = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+            series = f"{name}{{{label_str}}}" if label_str else name
+            lines.append(f"{series} {_format(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Write the textfile atomically so node-exporter never reads a partial file"""
+        path = Path(path)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+metrics = MetricsRegistry()
+
+metrics.describe('luna_files_converted_total', 'counter', 'Media files converted for publication')
+metrics.describe('luna_files_cache_hits_total', 'counter', 'Media conversions served from cache')
+metrics.describe('luna_media_bytes_in_total', 'counter', 'Bytes read from source media')
+metrics.describe('luna_media_bytes_out_total', 'counter', 'Bytes written as converted media')
+metrics.describe('luna_channel_duration_seconds', 'counter', 'Time spent in each channel command')
+metrics.describe('luna_step_duration_seconds', 'counter', 'Time spent in each per-project step')
+metrics.describe('luna_image_bytes_saved_total', 'counter', 'Bytes saved by web-optimized image encoding, by project')
+metrics.describe('luna_subprocesses_total', 'counter', 'Subprocesses spawned, by program')
+metrics.describe('luna_failures_total', 'counter', 'Errors logged, by logger')
+metrics.describe('luna_run_duration_seconds', 'gauge', 'Wall time of the run')
+metrics.describe('luna_run_success', 'gauge', '1 if the run finished without logged errors')
+metrics.describe('luna_run_timestamp_seconds', 'gauge', 'Unix time the run finished')
+
+
+class MetricsLogHandler(logging.Handler):
+    """Counts error records per logger, alongside the handlers set up by setup_logging"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        metrics.inc('luna_failures_total', logger=record.name)
+
+
+def record_conversion(media_type: str, source: Path, output: Path) -> None:
+    """Count bytes read and written by a media conversion"""
+    if not metrics.enabled:
+        return
+    metrics.inc('luna_media_bytes_in_total', Path(source).stat().st_size, media_type=media_type)
+    metrics.inc('luna_media_bytes_out_total', Path(output).stat().st_size, media_type=media_type)
+
+
+def record_cache_hit(media_type: str) -> None:
+    metrics.inc('luna_files_cache_hits_total', media_type=media_type)
+
+
+def _on_span(name: str, category: str, seconds: float, args: Dict) -> None:
+    if not metrics.enabled:
+        return
+    if category == 'channel':
+        metrics.inc('luna_channel_duration_seconds', seconds, channel=name)
+    elif category == 'project' and 'project' in args:
+        metrics.inc('luna_step_duration_seconds', seconds, step=name, project=args['project'])
+    elif category == 'convert':
+        media_type = CONVERSION_MEDIA_TYPES.get(name, name)
+        if 'error' not in args:
+            metrics.inc('luna_files_converted_total', media_type=media_type)
+
+
+def _on_audit(event: str, args) -> None:
+    if event == 'subprocess.Popen' and metrics.enabled:
+        program_args = args[1]
+        if isinstance(program_args, (list, tuple)) and program_args:
+            program = program_args[0]
+        else:
+            program = args[0] or program_args
+        metrics.inc('luna_subprocesses_total', program=os.path.basename(str(program).split(' ')[0]))
+
+
+_run_started = None
+
+
+def enable_metrics() -> None:
+    """Start collecting run metrics from spans, error logs and spawned subprocesses"""
+    global _run_started
+    if metrics.enabled:
+        return
+    metrics.enabled = True
+    _run_started = time.time()
+    add_span_listener(_on_span)
+    logging.getLogger().addHandler(MetricsLogHandler())
+    sys.addaudithook(_on_audit)
+
+
+def write_metrics(path) -> None:
+    """Finalize run-level gauges and write the textfile"""
+    now = time.time()
+    failures = metrics.total('luna_failures_total')
+    metrics.set('luna_run_duration_seconds', now - (_run_started or now))
+    metrics.set('luna_run_success', 0 if failures else 1)
+    metrics.set('luna_run_timestamp_seconds', now)
+    metrics.write(Path(path))
@@ -0,0 +1,87 @@
+import filecmp
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Union
+
+from src.script.metrics import metrics
+
+
+class OutputWriter:
+    """
+    Writes generated files only when their bytes change, so unchanged outputs keep
+    their mtime (no Jekyll regeneration, no git rehash). Counts changed and
+    unchanged writes for the current command.
+    """
+
+    def __init__(self):
+        self.changed = 0
+        self.unchanged = 0
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.changed = 0
+            self.unchanged = 0
+
+    def _count(self, changed: bool) -> None:
+        with self._lock:
+            if changed:
+                self.changed += 1
+            else:
+                self.unchanged += 1
+        metrics.inc('luna_outputs_total', state='changed' if changed else 'unchanged')
+
+    @staticmethod
+    def is_current(path: Path, data: bytes) -> bool:
+        """Whether path already holds exactly data; a size mismatch avoids reading it"""
+        try:
+            if path.stat().st_size != len(data):
+                return False
+            with open(path, 'rb') as f:
+                return f.read() == data
+        except FileNotFoundError:
+            return False
+
+    def write(self, path, content: Union[str, bytes]) -> bool:
+        """Atomically write content to path unless it is already there. Returns True if written."""
+        path = Path(path)
+        data = content.encode() if isinstance(content, str) else content
+
+        if self.is_current(path, data):
+            self._count(False)
+            return False
+
+        temp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self._count(True)
+        return True
+
+    def replace(self, source: Path, path: Path) -> bool:
+        """Move a finished file onto path unless path already holds the same bytes. Returns True if moved."""
+        source, path = Path(source), Path(path)
+        try:
+            unchanged = path.samefile(source) or (path.stat().st_size == source.stat().st_size and filecmp.cmp(source, path, shallow=False))
+        except FileNotFoundError:
+            unchanged = False
+
+        if unchanged:
+            source.unlink()
+        else:
+            os.replace(source, path)
+        self._count(not unchanged)
+        return not unchanged
+
+    def write_json(self, path, data) -> bool:
+        return self.write(path, json.dumps(data, indent=2) + "\n")
+
+    def summary(self) -> str:
+        return f"{self.changed} changed, {self.unchanged} unchanged"
+
+
+outputs = OutputWriter()
+
+metrics.describe('luna_outputs_total', 'counter', 'Generated output files, by whether their content changed')
@@ -0,0 +1,150 @@
+import json
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from moviepy.config import FFMPEG_BINARY
+
+# Every browser that plays H.264 decodes these profiles in 8-bit 4:2:0
+WEB_VIDEO_CODECS = ('h264',)
+WEB_VIDEO_PROFILES = ('constrained baseline', 'baseline', 'main', 'high')
+WEB_PIXEL_FORMATS = ('yuv420p',)
+# Highest H.264 level copied as-is (ffprobe reports level x 10): 4.2 is 1080p at 60 fps, which
+# phones decode in hardware; 4K and higher-rate levels are re-encoded like any other source
+WEB_VIDEO_MAX_LEVEL = 42
+# Frame size accepted when the level is unknown (ffmpeg -i doesn't print it)
+WEB_VIDEO_MAX_PIXELS = 1920 * 1080
+WEB_AUDIO_CODECS = ('aac',)
+WEB_AUDIO_PROFILES = ('lc', '')
+
+
+@dataclass
+class StreamInfo:
+    codec: str
+    profile: str = ''
+    pix_fmt: str = ''
+    level: int = 0
+    width: int = 0
+    height: int = 0
+
+
+@dataclass
+class VideoProbe:
+    duration: float = 0
+    video: List[StreamInfo] = field(default_factory=list)
+    audio: List[StreamInfo] = field(default_factory=list)
+
+    @property
+    def width(self) -> int:
+        return self.video[0].width if self.video else 0
+
+    @property
+    def height(self) -> int:
+        return self.video[0].height if self.video else 0
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.audio)
+
+    def video_is_web_ready(self) -> bool:
+        return len(self.video) == 1 and is_web_video(self.video[0])
+
+    def audio_is_web_ready(self) -> bool:
+        return all(is_web_audio(stream) for stream in self.audio)
+
+
+def is_web_video(stream: StreamInfo) -> bool:
+    return (stream.codec in WEB_VIDEO_CODECS
+            and stream.profile.lower() in WEB_VIDEO_PROFILES
+            and stream.pix_fmt in WEB_PIXEL_FORMATS
+            and is_web_level(stream))
+
+
+def is_web_level(stream: StreamInfo) -> bool:
+    """Within WEB_VIDEO_MAX_LEVEL, or at most 1080p when the level is unknown"""
+    if stream.level > 0:
+        return stream.level <= WEB_VIDEO_MAX_LEVEL
+    return stream.width * stream.height <= WEB_VIDEO_MAX_PIXELS
+
+
+def is_web_audio(stream: StreamInfo) -> bool:
+    return stream.codec in WEB_AUDIO_CODECS and stream.profile.lower() in WEB_AUDIO_PROFILES
+
+
+def ffprobe_binary() -> Optional[str]:
+    """ffprobe next to moviepy's ffmpeg, or on PATH; imageio-ffmpeg installs ship without one"""
+    sibling = Path(FFMPEG_BINARY).with_name(Path(FFMPEG_BINARY).name.replace('ffmpeg', 'ffprobe'))
+    if sibling != Path(FFMPEG_BINARY) and sibling.exists():
+        return str(sibling)
+    return shutil.which('ffprobe')
+
+
+def _probe_ffprobe(binary: str, video_file: Path) -> VideoProbe:
+    result = subprocess.run(
+        [binary, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', str(video_file)],
+        capture_output=True, text=True, check=True
+    )
+    data = json.loads(result.stdout)
+
+    probe = VideoProbe(duration=float(data.get('format', {}).get('duration') or 0))
+    for stream in data.get('streams', []):
+        info = StreamInfo(
+            codec=stream.get('codec_name', ''),
+            profile=stream.get('profile', ''),
+            pix_fmt=stream.get('pix_fmt', ''),
+            level=int(stream.get('level') or 0),
+            width=int(stream.get('width') or 0),
+            height=int(stream.get('height') or 0),
+        )
+        if stream.get('codec_type') == 'video' and not stream.get('disposition', {}).get('attached_pic'):
+            probe.video.append(info)
+        elif stream.get('codec_type') == 'audio':
+            probe.audio.append(info)
+    return probe
+
+
+_DURATION = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_VIDEO = re.compile(r"Stream #\S+: Video: (?P<codec>\w+)(?: \((?P<profile>[^)]*)\))?[^,]*, (?P<pix_fmt>\w+).*?(?P<width>\d{2,5})x(?P<height>\d{2,5})")
+_AUDIO = re.compile(r"Stream #\S+: Audio: (?P<codec>\w+)(?: \((?P<profile>[^)]*)\))?")
+
+
+def _probe_ffmpeg(video_file: Path) -> VideoProbe:
+    """Parse the stream summary `ffmpeg -i` prints when no ffprobe is available"""
+    result = subprocess.run([FFMPEG_BINARY, '-hide_banner', '-i', str(video_file)], capture_output=True, text=True)
+    output = result.stderr
+
+    probe = VideoProbe()
+    duration = _DURATION.search(output)
+    if duration:
+        hours, minutes, seconds = duration.groups()
+        probe.duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    for line in output.splitlines():
+        video = _VIDEO.search(line)
+        if video and '(attached pic)' not in line:
+            probe.video.append(StreamInfo(
+                codec=video['codec'],
+                profile=video['profile'] or '',
+                pix_fmt=video['pix_fmt'],
+                width=int(video['width']),
+                height=int(video['height']),
+            ))
+            continue
+        audio = _AUDIO.search(line)
+        if audio:
+            probe.audio.append(StreamInfo(codec=audio['codec'], profile=audio['profile'] or ''))
+
+    if not probe.video:
+        raise RuntimeError(f"Could not read video streams from {video_file.name}")
+    return probe
+
+
+def probe_video(video_file: Path) -> VideoProbe:
+    """Codecs, profiles and dimensions of a video's streams"""
+    binary = ffprobe_binary()
+    if binary:
+        return _probe_ffprobe(binary, Path(video_file))
+    return _probe_ffmpeg(Path(video_file))
@@ -0,0 +1,272 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import yaml
+
+from src.script.catalog import get_project_catalog
+from src.script.config import Config
+from src.script.constants import Files, Status
+from src.script.utils import get_project_path, is_public_github_repo
+
+# Sentinel for lazily computed fields that have not been loaded yet
+_UNSET = object()
+
+
+class ProjectRecord:
+    """
+    Typed view of a project's metadata, parsed once per metadata change.
+
+    Derived fields (dimensions, weight, GitHub visibility...) are computed on
+    first access and long text bodies are read from disk only when used.
+    Unknown attributes fall through to the `project` section of metadata.yml,
+    so a record can be passed to templates wherever `project` was a dict.
+    """
+
+    __slots__ = (
+        'name',
+        'path',
+        'config',
+        'signature',
+        'project',
+        'specs',
+        'requirements',
+        'exhibition',
+        '_written_content',
+        '_readme',
+        '_dimensions',
+        '_weight',
+        '_materials',
+        '_is_public',
+    )
+
+    def __init__(self, name: str, path: Path, config: Config, metadata: Dict, signature=None):
+        self.name = name
+        self.path = path
+        self.config = config
+        self.signature = signature
+
+        project = dict(metadata.get('project') or {})
+        project.pop('notes', None)
+        self.project = project
+        self.specs = metadata.get('physical_specifications') or {}
+        self.requirements = metadata.get('technical_requirements') or {}
+        self.exhibition = metadata.get('exhibition') or {}
+
+        self._written_content = _UNSET
+        self._readme = _UNSET
+        self._dimensions = _UNSET
+        self._weight = _UNSET
+        self._materials = _UNSET
+        self._is_public = _UNSET
+
+    @classmethod
+    def load(cls, name: str, path: Path, config: Config, signature=None) -> 'ProjectRecord':
+        with open(path / 'content' / Files.METADATA, 'r') as f:
+            metadata = yaml.safe_load(f)
+        return cls(name, path, config, metadata, signature)
+
+    def __getattr__(self, key):
+        # Only called for names that are not slots or properties
+        try:
+            return self.project[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __repr__(self) -> str:
+        return f"ProjectRecord({self.name!r})"
+
+    def expire(self) -> None:
+        """Forget fields read from outside metadata.yml (text bodies, GitHub visibility)"""
+        self._written_content = _UNSET
+        self._readme = _UNSET
+        self._is_public = _UNSET
+
+    def _read_text(self, file_name: str) -> str:
+        with open(self.path / 'content' / file_name, 'r') as f:
+            return f.read()
+
+    @property
+    def written_content(self) -> str:
+        if self._written_content is _UNSET:
+            self._written_content = self._read_text(Files.CONTENT)
+        return self._written_content
+
+    @property
+    def readme(self) -> str:
+        if self._readme is _UNSET:
+            self._readme = self._read_text(Files.README)
+        return self._readme
+
+    @property
+    def is_public(self) -> bool:
+        if self._is_public is _UNSET:
+            self._is_public = is_public_github_repo(self, self.name)
+        return self._is_public
+
+    @property
+    def website(self) -> Optional[str]:
+        if self.project.get('status') == Status.COMPLETE:
+            return f"{self.config.website_domain}/{self.name}"
+        return None
+
+    @property
+    def github(self) -> Optional[str]:
+        if self.is_public:
+            return f"{self.config.github_url_path}/{self.name}"
+        return None
+
+    @property
+    def dimensions(self) -> Optional[str]:
+        if self._dimensions is _UNSET:
+            self._dimensions = None
+            dims = self.specs.get('dimensions') or {}
+            if dims.get('width') and dims.get('height') and dims.get('depth'):
+                unit = dims.get('unit')
+                self._dimensions = f"{dims['width']}{unit} w x {dims['height']}{unit} h x {dims['depth']}{unit} d"
+        return self._dimensions
+
+    @property
+    def weight(self) -> Optional[str]:
+        if self._weight is _UNSET:
+            self._weight = None
+            weight = self.specs.get('weight') or {}
+            if weight.get('value'):
+                self._weight = f"{weight['value']} {weight['unit']}"
+        return self._weight
+
+    @property
+    def materials(self) -> Optional[str]:
+        if self._materials is _UNSET:
+            self._materials = ", ".join(self.specs['materials']) if self.specs.get('materials') else None
+        return self._materials
+
+    def exhibition_fields(self) -> Dict:
+        """Flattened exhibition setup/maintenance fields used by the PDF templates"""
+        fields = {}
+        setup = self.exhibition.get('setup') or {}
+        maintenance = self.exhibition.get('maintenance') or {}
+
+        if setup.get('instructions'):
+            fields['setup_instructions'] = setup['instructions']
+        if setup.get('time_required'):
+            fields['setup_time'] = setup['time_required']
+        if setup.get('people_required'):
+            fields['setup_people'] = setup['people_required']
+        if setup.get('tools_required'):
+            fields['setup_tools'] = ", ".join(setup['tools_required'])
+        if maintenance.get('supplies_needed'):
+            fields['maintenance_supplies'] = ", ".join(maintenance['supplies_needed'])
+        if maintenance.get('tasks'):
+            fields['maintenance_instructions'] = maintenance['tasks']
+
+        return fields
+
+    def project_fields(self) -> Dict:
+        """Project section as a plain dict, including links and text bodies (e.g. for post front matter)"""
+        fields = dict(self.project)
+        if self.website:
+            fields['website'] = self.website
+        if self.github:
+            fields['github'] = self.github
+        fields['written_content'] = self.written_content
+        fields['readme'] = self.readme
+        return fields
+
+    def to_context(self) -> Dict:
+        """Template context equivalent to the former nested metadata dict"""
+        context = {
+            'website': self.config.website_domain,
+            'github': self.config.github_url_path,
+            'github_username': self.config.github_username,
+            'project': self,
+        }
+
+        for key in ('dimensions', 'weight', 'materials'):
+            value = getattr(self, key)
+            if value:
+                context[key] = value
+
+        for key, value in self.requirements.items():
+            if value:
+                context[key] = value
+
+        return context | self.exhibition_fields()
+
+
+_records: Dict[Path, ProjectRecord] = {}
+_records_lock = threading.Lock()
+
+
+def get_project_record(self, name: str) -> ProjectRecord:
+    """Return the parsed record for a project, re-parsing only when metadata.yml changed"""
+    project_dir = get_project_path(self, name)
+    # Reuse the stat from this run's project discovery
+    stat = get_project_catalog(self).metadata_stat(name)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    record = _records.get(project_dir)
+    if record is None or record.signature != signature:
+        record = ProjectRecord.load(name, project_dir, self.config, signature)
+        with _records_lock:
+            _records[project_dir] = record
+    return record
+
+
+def expire_project_records() -> None:
+    """
+    Make cached records re-read content.md, README.md and GitHub visibility on next
+    use. Called once per command, so a long-lived process (e.g. `run`) never
+    publishes stale text while each command still reads them at most once.
+    """
+    with _records_lock:
+        for record in _records.values():
+            record.expire()
+
+
+# Reads kept in flight by load_project_records; on network filesystems per-file
+# latency, not bandwidth, dominates, so this is well above the CPU count
+BULK_LOAD_WORKERS = 16
+
+
+def _load_record(self, name: str, content: bool) -> ProjectRecord:
+    record = get_project_record(self, name)
+    if content:
+        for field in ('written_content', 'readme'):
+            try:
+                getattr(record, field)
+            except FileNotFoundError:
+                # Left unloaded; the error surfaces if the field is used
+                pass
+    return record
+
+
+def load_project_records(self, names: Optional[Iterable[str]] = None, content: bool = True, max_workers: int = BULK_LOAD_WORKERS) -> Dict[str, ProjectRecord]:
+    """
+    Records for the given projects (default: the whole catalog), read and parsed
+    concurrently. With content, text bodies are loaded too. Projects that fail to
+    load are logged and left out; the result keeps the order of names.
+    """
+    names = list(names) if names is not None else get_project_catalog(self).names()
+    if not names:
+        return {}
+
+    records = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(names)), thread_name_prefix='records') as executor:
+        futures = {name: executor.submit(_load_record, self, name, content) for name in names}
+        for name, future in futures.items():
+            try:
+                records[name] = future.result()
+            except Exception as e:
+                self.logger.error(f"Error reading project {name}: {e}")
+    return records
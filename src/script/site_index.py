@@ -0,0 +1,87 @@
+import json
+from typing import Dict, List
+
+from src.script.catalog import get_project_catalog
+from src.script.constants import Status
+from src.script.output import outputs
+from src.script.records import ProjectRecord, load_project_records
+
+# Tag that files a completed project under "Art" rather than "Other Work" on the roadmap
+ART_TAG = 'art'
+
+
+def index_entry(record: ProjectRecord) -> Dict:
+    """Public fields of a project as listed in the site index"""
+    featured_content = record.featured_content or {}
+    entry = {
+        'name': record.name,
+        'display_name': record.display_name,
+        'title': record.get('title'),
+        'tagline': record.get('tagline'),
+        'status': record.status,
+        'priority': record.get('priority', 0),
+        'date_created': str(record.date_created),
+        'tags': record.get('tags') or [],
+        'feature_post': bool(record.get('feature_post')),
+        'website': record.website,
+        'github': record.github,
+    }
+    if featured_content.get('type') == 'image' and featured_content.get('source'):
+        entry['featured_image'] = f"/media/{record.name}/{featured_content['source']}"
+    return entry
+
+
+def update_site_index(self, rebuild: bool = False) -> Dict[str, Dict]:
+    """
+    Refresh `_data/projects.json`, rebuilding entries only for projects whose
+    metadata.yml changed since the last run (which also skips their `gh` calls).
+    GitHub visibility is only re-checked for those, so rebuild re-reads every entry.
+    """
+    path = self.config.website_dir / '_data' / 'projects.json'
+    previous = {}
+    if path.exists():
+        with open(path, 'r') as f:
+            previous = json.load(f)
+
+    catalog = get_project_catalog(self)
+    signatures = {}
+    for name in catalog.names():
+        stat = catalog.metadata_stat(name)
+        signatures[name] = [stat.st_mtime_ns, stat.st_size]
+
+    changed = [name for name, signature in signatures.items() if rebuild or previous.get(name, {}).get('_signature') != signature]
+    records = load_project_records(self, changed, content=False)
+
+    index = {}
+    for name, signature in signatures.items():
+        if name in records:
+            index[name] = index_entry(records[name]) | {'_signature': signature}
+        elif name not in changed:
+            index[name] = previous[name]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    outputs.write_json(path, index)
+
+    self.logger.info(f"Updated site index ({len(records)} of {len(index)} projects rebuilt)")
+    return index
+
+
+def _by_priority(entries: List[Dict]) -> List[Dict]:
+    return sorted(entries, key=lambda e: (-(e['priority'] or 0), e['name']))
+
+
+def _by_date(entries: List[Dict]) -> List[Dict]:
+    return sorted(entries, key=lambda e: e['date_created'], reverse=True)
+
+
+def roadmap_sections(index: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+    """Index entries grouped the way the roadmap and links templates expect"""
+    entries = [{k: v for k, v in entry.items() if not k.startswith('_')} for entry in index.values()]
+    complete = [e for e in entries if e['status'] == Status.COMPLETE]
+    return {
+        'in_progress': _by_priority([e for e in entries if e['status'] == Status.IN_PROGRESS]),
+        'backlog': _by_priority([e for e in entries if e['status'] == Status.BACKLOG]),
+        'complete_art': _by_date([e for e in complete if ART_TAG in e['tags']]),
+        'complete_other': _by_date([e for e in complete if ART_TAG not in e['tags']]),
+        'featured_projects': _by_date([e for e in complete if e['feature_post']]),
+    }
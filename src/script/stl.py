@@ -0,0 +1,114 @@
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import trimesh
+
+STL_HEADER_SIZE = 80
+# One binary STL facet: normal, three vertices and the attribute byte count
+STL_FACET = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attributes', '<u2'),
+])
+# Facets processed per step while welding, which bounds temporary copies
+WELD_CHUNK = 1 << 20
+
+
+def binary_facet_count(path: Path) -> Optional[int]:
+    """
+    Facet count of a binary STL, or None for ASCII files. Binary files may also
+    start with 'solid', so the size implied by the header count is what decides.
+    """
+    size = path.stat().st_size
+    if size < STL_HEADER_SIZE + 4:
+        return None
+    with open(path, 'rb') as f:
+        f.seek(STL_HEADER_SIZE)
+        count = int(np.frombuffer(f.read(4), '<u4')[0])
+    return count if size == STL_HEADER_SIZE + 4 + count * STL_FACET.itemsize else None
+
+
+def read_binary_triangles(path: Path, count: int) -> np.ndarray:
+    """Triangle corners as an (n, 3, 3) float32 view into a memory map; nothing is copied"""
+    if count == 0:
+        return np.empty((0, 3, 3), dtype=np.float32)
+    facets = np.memmap(path, dtype=STL_FACET, mode='r', offset=STL_HEADER_SIZE + 4, shape=(count,))
+    # Normals are skipped; trimesh recomputes them on export
+    return facets['vertices']
+
+
+def read_ascii_triangles(path: Path) -> np.ndarray:
+    words = np.array(path.read_bytes().split())
+    starts = np.flatnonzero(words == b'vertex')
+    coords = words[starts[:, None] + np.arange(1, 4)].astype(np.float32)
+    return coords.reshape(-1, 3, 3)
+
+
+def _corner_keys(triangles: np.ndarray, tolerance: float) -> np.ndarray:
+    """One 12-byte row per corner, filled a chunk of facets at a time from the (possibly strided) input"""
+    keys = np.empty((len(triangles) * 3, 3), dtype=np.int32 if tolerance else np.float32)
+    for start in range(0, len(triangles), WELD_CHUNK):
+        block = triangles[start:start + WELD_CHUNK].reshape(-1, 3)
+        if tolerance:
+            block = np.round(block / tolerance)
+        else:
+            # Adding zero turns -0.0 into 0.0 so both compare equal bytewise
+            block = block + np.float32(0)
+        keys[start * 3:start * 3 + len(block)] = block
+    return keys
+
+
+def weld_vertices(triangles: np.ndarray, tolerance: float = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge shared corners into an indexed mesh. Corners within `tolerance` of a
+    common grid point are welded; degenerate faces left behind are dropped.
+
+    Works chunk by chunk so the only full-size buffers are the 12-byte corner
+    keys and the sort order (dropped before the face indices are built), keeping
+    peak memory near the size of the STL itself.
+    """
+    corner_count = len(triangles) * 3
+    chunk = WELD_CHUNK * 3
+    index_type = np.int32 if corner_count <= np.iinfo(np.int32).max else np.int64
+
+    # Compare each corner as one 12-byte value, which sorts far faster than unique(axis=0)
+    keys = _corner_keys(triangles, tolerance)
+    rows = keys.view(np.dtype((np.void, keys.itemsize * 3))).ravel()
+    # Stable, so tolerance welds keep the first corner's exact position
+    order = np.argsort(rows, kind='stable' if tolerance else None)
+
+    # Where each run of equal corners starts in sorted order
+    starts = np.ones(corner_count, dtype=bool)
+    for start in range(1, corner_count, chunk):
+        stop = min(start + chunk, corner_count)
+        starts[start:stop] = rows[order[start:stop]] != rows[order[start - 1:stop - 1]]
+    del rows, keys
+
+    first = order[starts]
+    inverse = np.empty(corner_count, dtype=index_type)
+    last_id = -1
+    for start in range(0, corner_count, chunk):
+        ids = np.cumsum(starts[start:start + chunk], dtype=index_type) + last_id
+        inverse[order[start:start + chunk]] = ids
+        last_id = ids[-1]
+    del order, starts
+
+    vertices = np.empty((len(first), 3), dtype=np.float32)
+    for start in range(0, len(first), chunk):
+        corners = first[start:start + chunk]
+        vertices[start:start + len(corners)] = triangles[corners // 3, corners % 3]
+
+    faces = inverse.reshape(-1, 3)
+    valid = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    return vertices, faces if valid.all() else faces[valid]
+
+
+def load_stl(path, tolerance: float = 0) -> trimesh.Trimesh:
+    """Load a binary or ASCII STL as a welded trimesh without Python-level per-facet work"""
+    path = Path(path)
+    count = binary_facet_count(path)
+    triangles = read_binary_triangles(path, count) if count is not None else read_ascii_triangles(path)
+    vertices, faces = weld_vertices(triangles, tolerance)
+    del triangles
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
@@ -0,0 +1,192 @@
+import math
+import shutil
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from moviepy.config import FFMPEG_BINARY
+
+from src.script.output import outputs
+from src.script.probe import VideoProbe, probe_video
+from src.script.tracing import traced
+from src.script.utils import file_digest
+
+# Folder under a project's website media holding one subfolder per streamed video
+STREAMS_DIR = 'streams'
+# Records the source digest and settings a stream was built from; written last
+STAMP_FILE = '.source'
+
+HLS_SEGMENT_SECONDS = 4
+SPRITE_COLUMNS = 10
+SPRITE_THUMB_WIDTH = 160
+SPRITE_INTERVAL = 2
+SPRITE_MAX_THUMBS = 100
+
+
+@dataclass(frozen=True)
+class Rendition:
+    height: int
+    video_bitrate: int  # kbit/s
+    audio_bitrate: int  # kbit/s
+
+
+# Rungs taller than the source are dropped; the smallest rung is always kept
+HLS_LADDER = (
+    Rendition(1080, 5000, 128),
+    Rendition(720, 2800, 128),
+    Rendition(480, 1400, 96),
+    Rendition(360, 800, 64),
+)
+
+
+def select_renditions(source_height: int) -> List[Rendition]:
+    renditions = [r for r in HLS_LADDER if r.height <= source_height]
+    return renditions or [HLS_LADDER[-1]]
+
+
+def _run_ffmpeg(args: List[str]) -> None:
+    result = subprocess.run([FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', '-y', *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"ffmpeg exited with {result.returncode}")
+
+
+def hls_args(video_file: Path, output_dir: Path, source: VideoProbe, renditions: List[Rendition]) -> List[str]:
+    """ffmpeg arguments encoding every rendition in one pass, with aligned keyframes"""
+    count = len(renditions)
+    splits = ''.join(f"[v{i}]" for i in range(count))
+    filters = [f"[0:v]split={count}{splits}"]
+    filters += [f"[v{i}]scale=-2:{r.height}[v{i}out]" for i, r in enumerate(renditions)]
+
+    args = ['-i', str(video_file), '-filter_complex', ';'.join(filters)]
+    stream_map = []
+    for i, r in enumerate(renditions):
+        args += [
+            '-map', f"[v{i}out]",
+            f"-c:v:{i}", 'libx264',
+            f"-b:v:{i}", f"{r.video_bitrate}k",
+            f"-maxrate:v:{i}", f"{int(r.video_bitrate * 1.07)}k",
+            f"-bufsize:v:{i}", f"{int(r.video_bitrate * 1.5)}k",
+        ]
+        if source.has_audio:
+            args += ['-map', '0:a:0', f"-c:a:{i}", 'aac', f"-b:a:{i}", f"{r.audio_bitrate}k"]
+            stream_map.append(f"v:{i},a:{i}")
+        else:
+            stream_map.append(f"v:{i}")
+
+    args += [
+        '-preset', 'veryfast',
+        '-profile:v', 'main',
+        '-pix_fmt', 'yuv420p',
+        # Keyframes on segment boundaries whatever the frame rate, so renditions switch cleanly
+        '-force_key_frames', f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})", '-sc_threshold', '0',
+        '-f', 'hls',
+        '-hls_time', str(HLS_SEGMENT_SECONDS),
+        '-hls_playlist_type', 'vod',
+        '-hls_flags', 'independent_segments',
+        '-hls_segment_filename', str(output_dir / 'stream_%v' / 'segment_%03d.ts'),
+        '-master_pl_name', 'master.m3u8',
+        '-var_stream_map', ' '.join(stream_map),
+        str(output_dir / 'stream_%v' / 'index.m3u8'),
+    ]
+    return args
+
+
+def create_poster(video_file: Path, output_path: Path, source: VideoProbe) -> None:
+    """Grab a frame a little into the clip, skipping fades from black"""
+    timestamp = min(1.0, source.duration / 10)
+    _run_ffmpeg(['-ss', f"{timestamp:.3f}", '-i', str(video_file), '-frames:v', '1', '-q:v', '3', str(output_path)])
+
+
+def create_sprite_sheet(video_file: Path, output_dir: Path, source: VideoProbe) -> None:
+    """Tile evenly spaced thumbnails into one JPEG and describe them in a WebVTT track"""
+    interval = max(SPRITE_INTERVAL, source.duration / SPRITE_MAX_THUMBS)
+    count = max(1, math.ceil(source.duration / interval))
+    columns = min(SPRITE_COLUMNS, count)
+    rows = math.ceil(count / columns)
+    thumb_width = SPRITE_THUMB_WIDTH
+    thumb_height = 2 * round(thumb_width * source.height / source.width / 2)
+
+    _run_ffmpeg([
+        '-i', str(video_file),
+        '-vf', f"fps=1/{interval:.3f},scale={thumb_width}:{thumb_height},tile={columns}x{rows}",
+        '-frames:v', '1', '-q:v', '5',
+        str(output_dir / 'sprites.jpg'),
+    ])
+
+    cues = ['WEBVTT', '']
+    for i in range(count):
+        start = i * interval
+        end = min((i + 1) * interval, source.duration)
+        x = (i % columns) * thumb_width
+        y = (i // columns) * thumb_height
+        cues.append(f"{_vtt_time(start)} --> {_vtt_time(end)}")
+        cues.append(f"sprites.jpg#xywh={x},{y},{thumb_width},{thumb_height}")
+        cues.append('')
+
+    outputs.write(output_dir / 'thumbnails.vtt', "\n".join(cues))
+
+
+def _vtt_time(seconds: float) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def _stamp(video_file: Path) -> str:
+    ladder = ','.join(f"{r.height}:{r.video_bitrate}:{r.audio_bitrate}" for r in HLS_LADDER)
+    return f"{file_digest(video_file)}:{ladder}:{HLS_SEGMENT_SECONDS}:{SPRITE_INTERVAL}"
+
+
+def stream_is_current(video_file: Path, output_dir: Path) -> bool:
+    """Whether output_dir holds a complete stream built from this source and these settings"""
+    stamp_path = output_dir / STAMP_FILE
+    return stamp_path.exists() and stamp_path.read_text() == _stamp(video_file)
+
+
+@traced('convert', label='file')
+def create_video_stream(self, video_file: Path, output_dir: Path) -> bool:
+    """
+    Build an HLS rendition ladder, poster and scrub sprites for a video in output_dir.
+    Returns False when the existing output was built from the same source and settings.
+    """
+    if stream_is_current(video_file, output_dir):
+        return False
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    source = probe_video(video_file)
+    if not source.video:
+        raise RuntimeError(f"No video stream in {video_file.name}")
+    renditions = select_renditions(source.height)
+    for i in range(len(renditions)):
+        (output_dir / f"stream_{i}").mkdir()
+
+    self.logger.info(f"Encoding {len(renditions)} HLS renditions for {video_file.name}")
+    _run_ffmpeg(hls_args(video_file, output_dir, source, renditions))
+    create_poster(video_file, output_dir / 'poster.jpg', source)
+    create_sprite_sheet(video_file, output_dir, source)
+
+    # Written last so an interrupted encode is redone next time
+    (output_dir / STAMP_FILE).write_text(_stamp(video_file))
+    return True
+
+
+def get_website_streams(self, name: str) -> Dict[str, List[str]]:
+    """Front matter URLs for a project's staged streams, in the same order as its videos"""
+    streams_dir = self.config.website_media_dir / name / STREAMS_DIR
+    streams = {'hls': [], 'posters': [], 'sprites': []}
+    if not streams_dir.exists():
+        return {}
+
+    for stream_dir in sorted(streams_dir.iterdir()):
+        if not (stream_dir / STAMP_FILE).exists():
+            continue
+        base = f"/media/{name}/{STREAMS_DIR}/{stream_dir.name}"
+        streams['hls'].append(f"{base}/master.m3u8")
+        streams['posters'].append(f"{base}/poster.jpg")
+        streams['sprites'].append(f"{base}/thumbnails.vtt")
+
+    return streams if streams['hls'] else {}
@@ -0,0 +1,119 @@
+import errno
+import fcntl
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+from src.script.utils import file_digest
+
+# ioctl request for cloning a whole file on copy-on-write filesystems (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+@dataclass
+class SyncStats:
+    copied: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    bytes_copied: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.copied} copied, {self.unchanged} unchanged, {self.removed} removed"
+
+
+def _copy_data(src: Path, dst: Path) -> None:
+    """Copy file contents, preferring a reflink and falling back to copy_file_range"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass
+
+        if hasattr(os, 'copy_file_range'):
+            remaining = os.fstat(fsrc.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst)
+
+
+def sync_file(src: Path, dst: Path, hardlink: bool = False) -> None:
+    """Atomically place a copy (or hardlink) of src at dst, preserving mtime"""
+    temp_path = dst.with_name(f".{dst.name}.sync")
+    if temp_path.exists():
+        temp_path.unlink()
+
+    if hardlink:
+        try:
+            os.link(src, temp_path)
+            os.replace(temp_path, dst)
+            return
+        except OSError:
+            pass
+
+    _copy_data(src, temp_path)
+    shutil.copystat(src, temp_path)
+    os.replace(temp_path, dst)
+
+
+def is_unchanged(src: Path, dst: Path, checksum: bool = False) -> bool:
+    """Compare by size and mtime, or by content hash when checksum is set"""
+    try:
+        dst_stat = dst.stat()
+    except FileNotFoundError:
+        return False
+    src_stat = src.stat()
+
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return True
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if checksum:
+        return file_digest(src) == file_digest(dst)
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def sync_files(plan: Dict[str, Path], dest_dir: Path, checksum: bool = False, hardlink: bool = False) -> SyncStats:
+    """
+    Make dest_dir contain exactly the files in plan (relative path -> source),
+    copying only changed files and removing ones no longer planned.
+    """
+    stats = SyncStats()
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    for rel_path, src in plan.items():
+        dst = dest_dir / rel_path
+        if is_unchanged(Path(src), dst, checksum):
+            stats.unchanged += 1
+            continue
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        sync_file(Path(src), dst, hardlink)
+        stats.copied += 1
+        stats.bytes_copied += dst.stat().st_size
+
+    planned = {str(Path(p)) for p in plan}
+    for root, dirs, files in os.walk(dest_dir, topdown=False):
+        for file_name in files:
+            path = Path(root) / file_name
+            if str(path.relative_to(dest_dir)) not in planned:
+                path.unlink()
+                stats.removed += 1
+        if Path(root) != dest_dir and not os.listdir(root):
+            os.rmdir(root)
+
+    return stats
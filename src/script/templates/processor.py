@@ -1,134 +1,124 @@
 import os
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from src.script.config import Config
-from src.script.constants import Status
-from src.script.utils import (
-    get_project_content,
-    get_project_metadata,
-    get_project_readme,
-    is_public_github_repo,
-    setup_logging,
-)
+from src.script.records import get_project_record
+from src.script.utils import setup_logging
 
 
-class TemplateProcessor:
-    def __init__(self, config: Config):
-        self.config = config
-        current_dir = Path(__file__).parent
-        self.logger = setup_logging(__name__)
+TEMPLATES_DIR = Path(__file__).parent
+BYTECODE_CACHE_DIR = Path(tempfile.gettempdir()) / 'luna-jinja-cache'
+
+
+class TemplateService:
+    """
+    Process-wide template store shared by every TemplateProcessor.
+
+    Compiled Jinja templates are kept in memory by the shared environment and
+    persisted across runs with a bytecode cache. Raw (non-Jinja) templates are
+    cached as strings and re-read only when their mtime changes.
+    """
+
+    def __init__(self, templates_dir: Path = TEMPLATES_DIR, cache_dir: Optional[Path] = BYTECODE_CACHE_DIR):
+        self.templates_dir = templates_dir
+        self._raw = {}
+        self._lock = threading.Lock()
+
+        bytecode_cache = None
+        if cache_dir:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+
         self.env = Environment(
-            loader=FileSystemLoader(current_dir),
+            loader=FileSystemLoader(templates_dir),
+            bytecode_cache=bytecode_cache,
             trim_blocks=True,
             lstrip_blocks=True,
+            cache_size=-1,
         )
-        
+
         def basename(path):
             return os.path.basename(path)
 
         self.env.filters['basename'] = basename
+
+    def render(self, template_name: str, context: Dict) -> str:
+        """Render a Jinja template, compiling it only on first use"""
+        return self.env.get_template(template_name).render(context)
+
+    def get_raw(self, template_name: str) -> str:
+        """Return the contents of a template file, cached until the file changes"""
+        template_path = self.templates_dir / template_name
+        mtime = template_path.stat().st_mtime_ns
+
+        cached = self._raw.get(template_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(template_path, 'r') as file:
+            content = file.read()
+
+        with self._lock:
+            self._raw[template_name] = (mtime, content)
+        return content
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_template_service() -> TemplateService:
+    """Return the shared template service, creating it on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = TemplateService()
+    return _service
+
+
+class TemplateProcessor:
+    def __init__(self, config: Config):
+        self.config = config
+        self.logger = setup_logging(__name__)
+        self.templates = get_template_service()
+        self.env = self.templates.env
         
     def process_github_readme_template(self, name, context):
-        template = self.env.get_template('github/README.md')
-        return template.render(context)
+        return self.templates.render('github/README.md', context)
 
     def process_pdf_cover_template(self, context):
-        template = self.env.get_template('pdf/cover.html')
-        return template.render(context)
+        return self.templates.render('pdf/cover.html', context)
 
     def process_pdf_project_template(self, name, context):
-        template = self.env.get_template('pdf/project.html')
-        return template.render(context)
+        return self.templates.render('pdf/project.html', context)
 
     def process_pdf_images_template(self, name, context):
-        template = self.env.get_template('pdf/project_images.html')
-        return template.render(context)
+        return self.templates.render('pdf/project_images.html', context)
 
     def get_post_template(self):
-        with open(f'{Path(__file__).parent}/web/post.md', 'r') as file:
-            return file.read()
+        return self.templates.get_raw('web/post.md')
 
     def get_roadmap_template(self):
-        with open(f'{Path(__file__).parent}/web/roadmap.md', 'r') as file:
-            return file.read()
+        return self.templates.get_raw('web/roadmap.md')
 
     def get_links_template(self):
-        with open(f'{Path(__file__).parent}/web/links.md', 'r') as file:
-            return file.read()
+        return self.templates.get_raw('web/links.md')
 
     def process_about_template(self, context):
-        template = self.env.get_template('web/about.md')
-        return template.render(context)
+        return self.templates.render('web/about.md', context)
 
     def process_project_metadata(self, name: str) -> Dict:
         
         try:
-            processed = {}
-            metadata = get_project_metadata(self, name)
-
-            processed['website'] = self.config.website_domain
-            processed['github'] = self.config.github_url_path
-            processed['github_username'] = self.config.github_username
-
-            project = metadata['project']
-
-            project.pop('notes', None)
-
-            if (project['status'] == Status.COMPLETE):
-                project['website'] = f"{self.config.website_domain}/{name}"
-            if is_public_github_repo(self, name):
-                project['github'] = f"{self.config.github_url_path}/{name}"
-
-            project['written_content'] = get_project_content(self, name)
-            project['readme'] = get_project_readme(self, name)
-
-            processed['project'] = project
-
-            specs = metadata['physical_specifications']
-                
-            if (specs['dimensions']['width'] and specs['dimensions']['height'] and specs['dimensions']['depth']):
-                processed['dimensions'] = f"{specs['dimensions']['width']}{specs['dimensions']['unit']} w x {specs['dimensions']['height']}{specs['dimensions']['unit']} h x {specs['dimensions']['depth']}{specs['dimensions']['unit']} d"
-
-            if specs['weight']['value']:
-                processed['weight'] = f"{specs['weight']['value']} {specs['weight']['unit']}"
-            
-            if specs['materials']:
-                processed['materials'] = ", ".join(specs['materials'])
-
-            
-            reqs = metadata['technical_requirements']
-            for key in reqs:
-                if reqs[key]:
-                    processed[key] = reqs[key]
-
-            ex = metadata['exhibition']
-
-            if ex['setup']['instructions']:
-                processed['setup_instructions'] = ex['setup']['instructions']
-            
-            if ex['setup']['time_required']:
-                processed['setup_time'] = ex['setup']['time_required']
-
-            if ex['setup']['people_required']:
-                processed['setup_people'] = ex['setup']['people_required']
-            
-            if ex['setup']['tools_required']:
-                processed['setup_tools'] = ", ".join(ex['setup']['tools_required'])
-
-            if ex['maintenance']['supplies_needed']:
-                processed['maintenance_supplies'] = ", ".join(ex['maintenance']['supplies_needed'])
-            
-            if ex['maintenance']['tasks']:
-                processed['maintenance_instructions'] = ex['maintenance']['tasks']
-
+            processed = get_project_record(self, name).to_context()
             self.logger.debug(f"Processed metadata for {name}")
             return processed
 
         except Exception as e:
             self.logger.error(f"Failed to process metadata for {name}: {e}")
             raise
-
-        
-
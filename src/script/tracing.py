@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+class Tracer:
+    """Collects completed spans as Chrome trace ("X") events, one track per thread."""
+
+    def __init__(self):
+        self.enabled = False
+        self._events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        self._origin = time.perf_counter_ns()
+        self.enabled = True
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int, args: Dict) -> None:
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start_ns - self._origin) / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': os.getpid(),
+            'tid': thread.ident,
+            'args': args,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    def write(self, path: Path) -> None:
+        """Write collected spans as Chrome/Perfetto trace JSON"""
+        pid = os.getpid()
+        with self._lock:
+            metadata = [
+                {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                for tid, name in self._threads.items()
+            ]
+            events = metadata + list(self._events)
+
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+_tracer = Tracer()
+
+# Callbacks receiving (name, category, seconds, args) for every finished span
+_listeners: List[Callable] = []
+
+
+def _active() -> bool:
+    return _tracer.enabled or bool(_listeners)
+
+
+class _Span:
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name: str, category: str, args: Dict):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        if _tracer.enabled:
+            _tracer.record(self.name, self.category, self.start, end, self.args)
+        for listener in _listeners:
+            listener(self.name, self.category, (end - self.start) / 1e9, self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, category: str = 'default', **args):
+    """Context manager timing a block; a shared no-op when tracing is disabled"""
+    if not _active():
+        return _NULL_SPAN
+    return _Span(name, category, {k: str(v) for k, v in args.items()})
+
+
+def traced(category: str, label: Optional[str] = None):
+    """
+    Decorator wrapping a function in a span named after it.
+    If `label` is given, the first argument after `self` is recorded under that key.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active():
+                return func(*args, **kwargs)
+            span_args = {}
+            if label and len(args) > 1:
+                arg = args[1]
+                span_args[label] = arg.name if isinstance(arg, Path) else str(arg)
+            with _Span(func.__qualname__, category, span_args):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable_tracing() -> None:
+    _tracer.enable()
+
+
+def write_trace(path) -> None:
+    _tracer.write(Path(path))
+
+
+def add_span_listener(listener: Callable) -> None:
+    """Register a callback for finished spans, e.g. to feed run metrics"""
+    _listeners.append(listener)
@@ -0,0 +1,172 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Errors that mean "slow down" rather than "this request is broken"
+RATE_LIMIT_ERRORS = ('PleaseWaitFewMinutes', 'RateLimitError', 'ClientThrottledError', 'FeedbackRequired')
+# Errors that need a human (2FA, challenge) before anything can be retried
+LOGIN_ERRORS = ('LoginRequired', 'ChallengeRequired', 'TwoFactorRequired', 'BadPassword')
+
+RATE_LIMIT_DELAY = 5 * 60
+# Upload ids older than this are re-sent instead of configured, as Instagram expires them
+UPLOAD_TTL = 6 * 60 * 60
+
+
+class UploadQueue:
+    """Album upload jobs persisted as JSON so interrupted posts resume where they stopped."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.jobs: List[Dict] = self._load()
+
+    def _load(self) -> List[Dict]:
+        if not self.path.exists():
+            return []
+        with open(self.path, 'r') as f:
+            return json.load(f).get('jobs', [])
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f".{self.path.name}.tmp")
+            with open(temp_path, 'w') as f:
+                json.dump({'jobs': self.jobs}, f, indent=2)
+            os.replace(temp_path, self.path)
+
+    def pending(self) -> List[Dict]:
+        return [job for job in self.jobs if job['status'] == 'pending']
+
+    def enqueue(self, project: str, caption: str, media: List[Path]) -> Dict:
+        """Queue an album post, reusing a pending job for the same project and media"""
+        paths = [str(path) for path in media]
+        for job in self.pending():
+            if job['project'] == project and [item['path'] for item in job['media']] == paths:
+                job['caption'] = caption
+                self.save()
+                return job
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'project': project,
+            'caption': caption,
+            'media': [{'path': path, 'upload': None} for path in paths],
+            'status': 'pending',
+            'attempts': 0,
+            'next_attempt_at': 0,
+            'error': None,
+            'created_at': time.time(),
+        }
+        self.jobs.append(job)
+        self.save()
+        return job
+
+
+def album_child(upload: Dict) -> Dict:
+    """Album child entry in the shape instagrapi's album_upload sends to album_configure"""
+    width, height = upload['width'], upload['height']
+    return {
+        'upload_id': upload['upload_id'],
+        'edits': json.dumps({'crop_original_size': [width, height], 'crop_center': [0.0, -0.0], 'crop_zoom': 1.0}),
+        'extra': json.dumps({'source_width': width, 'source_height': height}),
+        'scene_capture_type': '',
+        'scene_type': None,
+    }
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds requested by a Retry-After header on the error's HTTP response, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class UploadRunner:
+    """
+    Runs queued album jobs against an instagrapi-compatible client, uploading each
+    photo at most once and backing off exponentially on failures.
+    """
+
+    def __init__(self, client, queue: UploadQueue, logger, max_attempts: int = 5, base_delay: float = 30,
+                 max_delay: float = 30 * 60, sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.time):
+        self.client = client
+        self.queue = queue
+        self.logger = logger
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.clock = clock
+
+    def backoff(self, error: Exception, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        delay *= random.uniform(0.8, 1.2)
+        if type(error).__name__ in RATE_LIMIT_ERRORS:
+            delay = max(delay, RATE_LIMIT_DELAY)
+        requested = retry_after(error)
+        if requested:
+            delay = max(delay, requested)
+        return delay
+
+    def upload_media(self, job: Dict) -> None:
+        now = self.clock()
+        for item in job['media']:
+            upload = item['upload']
+            if upload and now - upload['uploaded_at'] < UPLOAD_TTL:
+                continue
+
+            upload_id, width, height = self.client.photo_rupload(Path(item['path']), to_album=True)
+            item['upload'] = {
+                'upload_id': upload_id,
+                'width': width,
+                'height': height,
+                'uploaded_at': self.clock(),
+            }
+            self.queue.save()
+            self.logger.info(f"Uploaded {Path(item['path']).name} for {job['project']}")
+
+    def configure(self, job: Dict, location=None) -> None:
+        children = [album_child(item['upload']) for item in job['media']]
+        if not self.client.album_configure(children, job['caption'], [], location):
+            raise RuntimeError(f"Instagram did not accept album for {job['project']}")
+
+        media = (getattr(self.client, 'last_json', None) or {}).get('media') or {}
+        job['media_pk'] = media.get('pk')
+        job['status'] = 'done'
+        job['error'] = None
+        self.queue.save()
+
+    def run(self, job: Dict, location=None) -> None:
+        """Run a job to completion, retrying with backoff; raises once it has to give up"""
+        tries = 0
+        while job['status'] == 'pending':
+            wait = job['next_attempt_at'] - self.clock()
+            if wait > 0:
+                self.logger.info(f"Waiting {wait:.0f}s before retrying {job['project']}")
+                self.sleep(wait)
+
+            try:
+                self.upload_media(job)
+                self.configure(job, location)
+                self.logger.info(f"Published album for {job['project']}")
+            except Exception as e:
+                tries += 1
+                job['attempts'] += 1
+                job['error'] = f"{type(e).__name__}: {e}"
+                job['next_attempt_at'] = self.clock() + self.backoff(e, job['attempts'])
+                self.queue.save()
+
+                if type(e).__name__ in LOGIN_ERRORS or tries >= self.max_attempts:
+                    # Leave the job pending so the next run resumes it
+                    raise
+
+                self.logger.warning(f"Upload for {job['project']} failed (attempt {job['attempts']}): {e}")
@@ -1,17 +1,31 @@
+import hashlib
+import io
 import logging
-import os
+import math
 import re
 import subprocess
+import tempfile
 from pathlib import Path
-from typing import Literal
+from typing import List, Literal, Optional
 
 import numpy as np
 import trimesh
 import yaml
 from moviepy import VideoFileClip
-from PIL import Image
+from moviepy.config import FFMPEG_BINARY
+from PIL import Image, ImageCms
 
 from src.script.constants import Files, Media
+from src.script.imaging import get_image_backend
+from src.script.probe import VideoProbe, probe_video
+from src.script.stl import load_stl
+from src.script.tracing import traced
+
+# Instagram accepts aspect ratios between 4:5 portrait and 1.91:1 landscape
+INSTAGRAM_WIDTH = 1080
+INSTAGRAM_MIN_ASPECT = 4 / 5
+INSTAGRAM_MAX_ASPECT = 1.91
+INSTAGRAM_QUALITY = 88
 
 
 def setup_logging(name: str):
@@ -39,26 +53,22 @@ def format_name(self, display_name: str) -> str:
 
 def load_template(self, template_name: str) -> str:
     """Load a template file and return its contents"""
-    script_dir = Path(__file__).resolve().parent
-    templates_dir = script_dir.parent / 'templates'
-    template_path = templates_dir / template_name
+    from src.script.templates.processor import get_template_service
+
     try:
-        with open(template_path, 'r') as f:
-            return f.read()
+        return get_template_service().get_raw(template_name)
     except FileNotFoundError:
-        self.logger.error(f"Template file not found: {template_path}")
+        self.logger.error(f"Template file not found: {template_name}")
         raise
 
 def load_personal_info(self):
-    script_dir = Path(__file__).resolve().parent.parent
-    with open(script_dir / 'personal-info.yml', 'r') as f:
+    with open(self.config.personal_info_file, 'r') as f:
         return yaml.safe_load(f)
 
 
-def is_public_github_repo(self, name) -> str:
+def is_public_github_repo(self, name) -> bool:
     project_dir = get_project_path(self, name)
-    os.chdir(project_dir)
-    visibility = subprocess.run(['gh', 'repo', 'view', '--json', 'visibility', '-q', '.visibility'], capture_output=True, text=True)
+    visibility = subprocess.run(['gh', 'repo', 'view', '--json', 'visibility', '-q', '.visibility'], capture_output=True, text=True, cwd=project_dir)
     visibility = visibility.stdout.strip().upper()
     if visibility == 'PUBLIC':
         return True
@@ -102,13 +112,53 @@ def get_project_readme(self, name: str) -> str:
     with open(project_dir / 'content' / Files.README, 'r') as f:
         return f.read()
 
+TEMP_DIR = Path('temp')
+
+def make_temp_path(file_name: str) -> Path:
+    """Unique temp location keeping file_name, so concurrent conversions never collide"""
+    TEMP_DIR.mkdir(exist_ok=True)
+    return Path(tempfile.mkdtemp(dir=TEMP_DIR)) / file_name
+
+def release_temp_file(path: Path) -> None:
+    """Delete a file created at make_temp_path and its private folder"""
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    try:
+        path.parent.rmdir()
+    except OSError:
+        pass
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
 def get_project_path(self, name: str) -> Path:
     return self.config.base_dir / name
 
+_digests = {}
+
+def file_digest(path) -> str:
+    """SHA-256 of a file's contents, memoized on path, size and mtime"""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.file_digest(f, 'sha256').hexdigest()
+        _digests[key] = digest
+    return digest
+
+@traced('convert', label='file')
 def convert_model_file(self, model_file, output_format: Literal['glb']='glb'):
     try:
         # Load the STL file
-        mesh = trimesh.load(model_file)
+        if Path(model_file).suffix.lower() == '.stl':
+            mesh = load_stl(model_file)
+        else:
+            mesh = trimesh.load(model_file)
         mesh.visual.face_colors = [232,170,191]
 
         rotation_matrix = trimesh.transformations.rotation_matrix(
@@ -136,8 +186,7 @@ def convert_model_file(self, model_file, output_format: Literal['glb']='glb'):
         }
 
         # Create temp file with new extension
-        temp_path = Path('temp') / f"{model_file.stem}.{output_format}"
-        temp_path.parent.mkdir(exist_ok=True)  # Ensure temp directory exists
+        temp_path = make_temp_path(f"{model_file.stem}.{output_format}")
         
         # Export to temp file
         scene.export(str(temp_path), file_type=output_format)
@@ -147,12 +196,52 @@ def convert_model_file(self, model_file, output_format: Literal['glb']='glb'):
     except Exception as e:
         raise self.logger.error(f"Failed to convert model: {str(e)}")
 
+def web_video_codec_args(probe: VideoProbe) -> Optional[List[str]]:
+    """
+    ffmpeg codec arguments that stream-copy web-ready streams and re-encode only the others.
+    Returns None when no stream can be copied, so a full transcode is no slower.
+    """
+    video_ready = probe.video_is_web_ready()
+    audio_ready = probe.has_audio and probe.audio_is_web_ready()
+    if not video_ready and not audio_ready:
+        return None
+
+    args = ['-map', '0:v:0', '-map', '0:a?']
+    if video_ready:
+        args += ['-c:v', 'copy', '-tag:v', 'avc1']
+    else:
+        args += ['-c:v', 'libx264', '-profile:v', 'baseline', '-level', '3.0', '-pix_fmt', 'yuv420p']
+    args += ['-c:a', 'copy'] if audio_ready or not probe.has_audio else ['-c:a', 'aac']
+    return args
+
+def remux_video_file(video_file, output_path, codec_args: List[str]) -> None:
+    result = subprocess.run(
+        [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', '-y', '-i', str(video_file),
+         *codec_args, '-movflags', '+faststart', str(output_path)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"ffmpeg exited with {result.returncode}")
+
+@traced('convert', label='file')
 def convert_video_file(self, video_file, output_format: Literal['mp4', 'webm'] = 'mp4'):
     try:
-        video = VideoFileClip(video_file)
         # Create temp file with new extension
-        temp_path = Path('temp') / f"{video_file.stem}.{output_format}"
-        temp_path.parent.mkdir(exist_ok=True)  # Ensure temp directory exists
+        temp_path = make_temp_path(f"{video_file.stem}.{output_format}")
+
+        if output_format == 'mp4':
+            # Copy streams that already meet the web preset instead of re-encoding them
+            try:
+                codec_args = web_video_codec_args(probe_video(video_file))
+            except Exception as e:
+                self.logger.warning(f"Could not probe {video_file.name}, transcoding: {e}")
+                codec_args = None
+            if codec_args:
+                self.logger.info(f"Remuxing {video_file.name} ({' '.join(codec_args[4:])})")
+                remux_video_file(video_file, temp_path, codec_args)
+                return temp_path
+
+        video = VideoFileClip(video_file)
         
         if output_format == 'mp4':
             video.write_videofile(
@@ -180,31 +269,111 @@ def convert_video_file(self, video_file, output_format: Literal['mp4', 'webm'] =
 
 
 def get_image_dimensions(self, image_path):
-    from PIL import Image
-    
-    with Image.open(image_path) as img:
-        return img.size
+    """Upright image size, read from the header where the backend allows"""
+    return get_image_backend(self).dimensions(image_path)
 
+@traced('convert', label='file')
 def resize_image_file(self, image_file, max_width: int=-1, max_height: int=-1):
         
-    with Image.open(image_file) as img:
-        # Get original dimensions
-        width, height = img.size
-        width_ratio = 1 if max_width == -1 else max_width / width
-        height_ratio = 1 if max_height == -1 else max_height / height
-        
-        # Use the smaller ratio to ensure both dimensions fit within maximums
-        scale_ratio = min(width_ratio, height_ratio)
-        
-        # Calculate new dimensions
-        new_width = int(width * scale_ratio)
-        new_height = int(height * scale_ratio)
-                    
-        # Resize the image
-        resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    # Decode straight to the size that fits both maximums (scaling up small images too)
+    resized_img = get_image_backend(self).load_fitted(image_file, max_width, max_height, upscale=True)
         
-        # Create temp file with same name but in temp directory
-        temp_path = Path('temp') / image_file.name
-        temp_path.parent.mkdir(exist_ok=True)  # Ensure temp directory exists
-        resized_img.save(temp_path)
-        return temp_path
\ No newline at end of file
+    # Create temp file with same name in its own temp directory
+    temp_path = make_temp_path(image_file.name)
+    resized_img.save(temp_path)
+    return temp_path
+
+def convert_to_srgb(img: Image.Image) -> Image.Image:
+    """Convert an image to RGB in the sRGB color space using its embedded ICC profile if present"""
+    icc_profile = img.info.get('icc_profile')
+    if icc_profile:
+        try:
+            source_profile = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+            srgb_profile = ImageCms.createProfile('sRGB')
+            if img.mode not in ('RGB', 'CMYK', 'L'):
+                img = img.convert('RGB')
+            return ImageCms.profileToProfile(img, source_profile, srgb_profile, outputMode='RGB')
+        except (ImageCms.PyCMSError, OSError):
+            pass
+    return img.convert('RGB')
+
+def clamp_aspect_ratio(img: Image.Image, min_aspect: float, max_aspect: float) -> Image.Image:
+    """Center-crop an image so its width/height ratio falls within [min_aspect, max_aspect]"""
+    width, height = img.size
+    aspect = width / height
+    if aspect < min_aspect:
+        new_height = round(width / min_aspect)
+        top = (height - new_height) // 2
+        return img.crop((0, top, width, top + new_height))
+    if aspect > max_aspect:
+        new_width = round(height * max_aspect)
+        left = (width - new_width) // 2
+        return img.crop((left, 0, left + new_width, height))
+    return img
+
+@traced('convert', label='file')
+def create_instagram_image(self, image_file, output_path, width: int = INSTAGRAM_WIDTH, quality: int = INSTAGRAM_QUALITY):
+    """Render an Instagram-compliant JPEG: sRGB, aspect clamped to 4:5-1.91:1, at most `width` px wide"""
+    backend = get_image_backend(self)
+
+    # Load only as many pixels as the cropped result keeps
+    source_width, source_height = backend.dimensions(image_file)
+    cropped_width = min(source_width, round(source_height * INSTAGRAM_MAX_ASPECT))
+    scale_ratio = min(1, width / cropped_width)
+    img = backend.load_fitted(image_file, math.ceil(source_width * scale_ratio), math.ceil(source_height * scale_ratio))
+
+    img = convert_to_srgb(img)
+    img = clamp_aspect_ratio(img, INSTAGRAM_MIN_ASPECT, INSTAGRAM_MAX_ASPECT)
+
+    if img.width > width:
+        img = img.resize((width, round(img.height * width / img.width)), Image.Resampling.LANCZOS)
+
+    img.save(output_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return output_path
+
+# Palette PNGs are used only when quantizing keeps at least this PSNR (dB)
+WEB_PNG_MIN_PSNR = 45
+
+def _psnr(original: Image.Image, candidate: Image.Image) -> float:
+    a = np.asarray(original, dtype=np.float32)
+    b = np.asarray(candidate.convert(original.mode), dtype=np.float32)
+    mse = float(np.mean((a - b) ** 2))
+    return float('inf') if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+def _quantize_png(img: Image.Image) -> Image.Image:
+    """Palette version of img when it is lossless or close enough, otherwise img"""
+    if img.mode == 'RGBA' and img.getcolors(256) is None:
+        # Pillow can only quantize RGBA with FASTOCTREE, which is too lossy for photos
+        return img
+    method = Image.Quantize.FASTOCTREE if img.mode == 'RGBA' else Image.Quantize.MEDIANCUT
+    quantized = img.quantize(256, method=method, dither=Image.Dither.NONE)
+    return quantized if _psnr(img, quantized) >= WEB_PNG_MIN_PSNR else img
+
+@traced('convert', label='file')
+def create_web_image(self, image_file, max_width: int = -1, max_height: int = -1, quality: Optional[int] = None):
+    """
+    Resize an image for the website (never upscaling) and encode it compactly:
+    progressive optimized JPEG (at WEBSITE_IMAGE_QUALITY unless quality is given)
+    or optimized, palette-quantized PNG, without metadata.
+    """
+    if quality is None:
+        quality = self.config.website_image_quality
+    image_file = Path(image_file)
+    is_png = image_file.suffix.lower() == '.png'
+    # Browsers can't show TIFF, so anything that isn't PNG or JPEG is named for the JPEG it becomes
+    is_jpeg = image_file.suffix.lower() in ('.jpg', '.jpeg')
+    temp_path = make_temp_path(image_file.name if is_png or is_jpeg else f"{image_file.stem}.jpg")
+
+    img = get_image_backend(self).load_fitted(image_file, max_width, max_height)
+    if is_png and ('A' in img.getbands() or 'transparency' in img.info):
+        img = img.convert('RGBA')
+    else:
+        img = convert_to_srgb(img)
+
+    # Only pixel data is written: no EXIF, ICC profile or text chunks
+    if is_png:
+        _quantize_png(img).save(temp_path, 'PNG', optimize=True)
+    else:
+        img.save(temp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+
+    return temp_path
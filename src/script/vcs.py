@@ -0,0 +1,217 @@
+import importlib
+import logging
+import re
+import subprocess
+from pathlib import Path
+
+GIT_BACKENDS = ('auto', 'pygit2', 'git')
+# Like git itself: a colon before any slash means an scp-like SSH address (git@github.com:user/repo.git)
+SCP_LIKE_URL = re.compile(r'^[^/:]+:')
+
+
+class GitError(Exception):
+    pass
+
+
+def remote_transport(url: str) -> str:
+    """'local', 'ssh' or the URL scheme of a remote"""
+    if url.startswith('ssh://') or (SCP_LIKE_URL.match(url) and '://' not in url):
+        return 'ssh'
+    if '://' not in url or url.startswith('file://'):
+        return 'local'
+    return url.split('://', 1)[0]
+
+
+class GitRepository:
+    """A working copy driven through the git command line"""
+
+    name = 'git'
+
+    def __init__(self, path, logger=None):
+        self.path = Path(path)
+        self.logger = logger or logging.getLogger(__name__)
+
+    @classmethod
+    def init(cls, path, branch: str = 'main', logger=None) -> 'GitRepository':
+        repo = cls(path, logger)
+        repo._git('init')
+        repo._git('symbolic-ref', 'HEAD', f'refs/heads/{branch}')
+        return repo
+
+    def _git(self, *args, check: bool = True) -> subprocess.CompletedProcess:
+        result = subprocess.run(['git', *args], capture_output=True, text=True, cwd=self.path)
+        if check and result.returncode != 0:
+            raise GitError(f"git {args[0]} failed in {self.path}: {(result.stderr or result.stdout).strip()}")
+        return result
+
+    def is_dirty(self) -> bool:
+        """Whether the working copy has uncommitted or untracked changes"""
+        return bool(self._git('status', '--porcelain').stdout.strip())
+
+    def add(self, *paths) -> None:
+        self._git('add', '--', *[str(path) for path in paths])
+
+    def add_all(self) -> None:
+        """Stage every new, modified and deleted file"""
+        self._git('add', '--all')
+
+    def commit(self, message: str) -> bool:
+        """Commit the index. Returns False (and commits nothing) if nothing is staged."""
+        if self._git('diff', '--cached', '--quiet', check=False).returncode == 0:
+            return False
+        self._git('commit', '-m', message)
+        return True
+
+    def push(self, remote: str = 'origin', branch: str = 'main', set_upstream: bool = False) -> None:
+        self._git('push', *(['-u'] if set_upstream else []), remote, branch)
+
+    def remote_url(self, remote: str = 'origin') -> str:
+        return self._git('remote', 'get-url', remote).stdout.strip()
+
+    def set_remote_url(self, url: str, remote: str = 'origin') -> None:
+        self._git('remote', 'set-url', remote, url)
+
+
+class Pygit2Repository(GitRepository):
+    """
+    A working copy driven in-process through libgit2, so status, add, commit and push
+    share one open repository instead of spawning git for each step. Pushes go
+    in-process to local and SSH remotes (keys from ssh-agent); other remotes, and SSH
+    pushes libgit2 cannot authenticate, fall back to the git command line.
+    """
+
+    name = 'pygit2'
+
+    def __init__(self, path, logger=None):
+        super().__init__(path, logger)
+        import pygit2
+        self.pygit2 = pygit2
+        try:
+            self.repo = pygit2.Repository(str(self.path))
+        except pygit2.GitError as e:
+            raise GitError(f"Not a git repository: {self.path}: {e}") from e
+
+    @classmethod
+    def init(cls, path, branch: str = 'main', logger=None) -> 'Pygit2Repository':
+        import pygit2
+        pygit2.init_repository(str(path), initial_head=branch)
+        return cls(path, logger)
+
+    def is_dirty(self) -> bool:
+        return bool(self.repo.status())
+
+    def add(self, *paths) -> None:
+        index = self.repo.index
+        index.read(False)
+        for path in paths:
+            index.add(Path(path).as_posix())
+        index.write()
+
+    def add_all(self) -> None:
+        FileStatus = self.pygit2.enums.FileStatus
+        index = self.repo.index
+        index.read(False)
+        for path, flags in self.repo.status().items():
+            if flags & FileStatus.WT_DELETED:
+                index.remove(path)
+            elif flags & (FileStatus.WT_NEW | FileStatus.WT_MODIFIED | FileStatus.WT_TYPECHANGE):
+                index.add(path)
+        index.write()
+
+    def commit(self, message: str) -> bool:
+        index = self.repo.index
+        index.read(False)
+        tree = index.write_tree()
+        parents = []
+        if not self.repo.head_is_unborn:
+            head = self.repo.head.peel(self.pygit2.Commit)
+            if head.tree_id == tree:
+                return False
+            parents = [head.id]
+
+        try:
+            signature = self.repo.default_signature
+        except KeyError as e:
+            raise GitError(f"Set git user.name and user.email to commit in {self.path}") from e
+        self.repo.create_commit('HEAD', signature, signature, message, tree, parents)
+        return True
+
+    def _push_callbacks(self, rejected: dict):
+        pygit2 = self.pygit2
+
+        class PushCallbacks(pygit2.RemoteCallbacks):
+            attempts = 0
+
+            def credentials(self, url, username_from_url, allowed_types):
+                # libgit2 asks again after a rejected key; stop rather than retry forever
+                self.attempts += 1
+                if self.attempts > 1:
+                    raise pygit2.GitError(f"ssh-agent credentials were rejected for {url}")
+                return pygit2.KeypairFromAgent(username_from_url or 'git')
+
+            def push_update_reference(self, refname, message):
+                # The server accepted the push but refused this ref (e.g. not a fast-forward)
+                if message:
+                    rejected[refname] = message
+
+        return PushCallbacks()
+
+    def push(self, remote: str = 'origin', branch: str = 'main', set_upstream: bool = False) -> None:
+        url = self.remote_url(remote)
+        transport = remote_transport(url)
+        if transport == 'ssh' and not self.pygit2.features & self.pygit2.enums.Feature.SSH:
+            transport = 'unsupported'
+        if transport not in ('local', 'ssh'):
+            return super().push(remote, branch, set_upstream)
+
+        ref = f'refs/heads/{branch}'
+        rejected = {}
+        try:
+            self.repo.remotes[remote].push([f'{ref}:{ref}'], callbacks=self._push_callbacks(rejected))
+        except self.pygit2.GitError as e:
+            if transport == 'local':
+                raise GitError(f"Push to {url} failed: {e}") from e
+            # libgit2 only reads keys from ssh-agent and ignores ~/.ssh/config; git handles both
+            self.logger.info(f"In-process push to {url} failed ({e}), retrying with git")
+            return super().push(remote, branch, set_upstream)
+        if rejected:
+            raise GitError(f"Push to {url} rejected: {', '.join(f'{ref} ({message})' for ref, message in rejected.items())}")
+
+        if set_upstream:
+            self.repo.config[f'branch.{branch}.remote'] = remote
+            self.repo.config[f'branch.{branch}.merge'] = ref
+
+    def remote_url(self, remote: str = 'origin') -> str:
+        try:
+            return self.repo.remotes[remote].url
+        except KeyError as e:
+            raise GitError(f"No remote named '{remote}' in {self.path}") from e
+
+    def set_remote_url(self, url: str, remote: str = 'origin') -> None:
+        self.repo.remotes.set_url(remote, url)
+
+
+def get_git_backend(self) -> type:
+    """Repository class selected by GIT_BACKEND: git, pygit2, or auto (pygit2 when installed)"""
+    choice = self.config.git_backend
+    if choice not in GIT_BACKENDS:
+        raise ValueError(f"GIT_BACKEND must be one of {', '.join(GIT_BACKENDS)}, not '{choice}'")
+    if choice == 'git':
+        return GitRepository
+
+    try:
+        importlib.import_module('pygit2')
+        return Pygit2Repository
+    except ImportError as e:
+        if choice == 'pygit2':
+            self.logger.error(f"GIT_BACKEND=pygit2 but pygit2 could not be loaded: {e}")
+            raise
+        return GitRepository
+
+
+def open_repository(self, path) -> GitRepository:
+    return get_git_backend(self)(path, self.logger)
+
+
+def init_repository(self, path, branch: str = 'main') -> GitRepository:
+    return get_git_backend(self).init(path, branch, self.logger)